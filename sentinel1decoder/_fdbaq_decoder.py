@@ -4,10 +4,11 @@ Created on Fri Jul  1 10:37:42 2022.
 
 @author: richa
 """
-import math
 import logging
 
-from ._sample_code import SampleCode
+import numpy as np
+
+from ._jit import HAVE_NUMBA, njit
 
 _TREE_BRC_ZERO = (0, (1, (2, 3)))
 _TREE_BRC_ONE = (0, (1, (2, (3, 4))))
@@ -15,247 +16,179 @@ _TREE_BRC_TWO = (0, (1, (2, (3, (4, (5, 6))))))
 _TREE_BRC_THREE = ((0, 1), (2, (3, (4, (5, (6, (7, (8, 9))))))))
 _TREE_BRC_FOUR = ((0, (1, 2)), ((3, 4), ((5, 6), (7, (8, (9, ((10, 11), ((12, 13), (14, 15)))))))))
 
-class FDBAQDecoder:
-    """Extracts sample codes from Sentinel-1 packets."""
+# The BRC determines which type of Huffman encoding we're using
+# Ref. SAR Space Protocol Data Unit p.71
+_HUFFMAN_TREES = (_TREE_BRC_ZERO, _TREE_BRC_ONE, _TREE_BRC_TWO, _TREE_BRC_THREE, _TREE_BRC_FOUR)
+
+# Bits needed to hold a sign bit and the longest Huffman code (10 bits)
+_PEEK_BITS = 11
+
+# Zero bytes appended to the data, so bits can be read a few bytes at a time
+# right up to the end of the data.
+_PADDING = bytes(4)
+
+
+def _huffman_codes(node, code=0, length=0):
+    """Yield the (code, length, mcode) of each leaf in a Huffman tree."""
+    if isinstance(node, int):
+        yield code, length, node
+    else:
+        for bit, child in enumerate(node):
+            yield from _huffman_codes(child, (code << 1) | bit, length + 1)
+
+
+def _build_huffman_lut():
+    """
+    Tabulate the sample code starting with every possible run of _PEEK_BITS bits.
+
+    A sample code is a sign bit followed by a Huffman coded magnitude. The
+    entry at [(brc << _PEEK_BITS) | bits] holds the mcode in bits 0-3, the
+    sign in bit 4, and the total length of the sample code from bit 5 up.
+
+    Returns:
+        A 1D uint16 array of packed sample code entries.
+    """
+    lut = np.zeros(len(_HUFFMAN_TREES) << _PEEK_BITS, dtype=np.uint16)
+    for brc, tree in enumerate(_HUFFMAN_TREES):
+        for code, length, mcode in _huffman_codes(tree):
+            for sign in range(2):
+                # Every run of bits starting with this sample code decodes the same
+                unused_bits = _PEEK_BITS - 1 - length
+                start = (brc << _PEEK_BITS) | (((sign << length) | code) << unused_bits)
+                lut[start:start + (1 << unused_bits)] = mcode | (sign << 4) | ((length + 1) << 5)
+    return lut
+
+
+_HUFFMAN_LUT = _build_huffman_lut()
+
+# Without Numba the decoder runs as plain Python, which indexes lists and
+# bytes far faster than it does NumPy arrays.
+_HUFFMAN_LUT_LIST = _HUFFMAN_LUT.tolist()
+
+
+@njit(cache=True)
+def _peek_bits(data, bit_pos, num_bits):
+    """Read up to 17 bits from bit_pos as an unsigned big-endian integer."""
+    byte_index = bit_pos >> 3
+    window = (int(data[byte_index]) << 16) | (int(data[byte_index + 1]) << 8) | int(data[byte_index + 2])
+    return (window >> (24 - num_bits - (bit_pos & 7))) & ((1 << num_bits) - 1)
+
+
+@njit(cache=True, nogil=True)
+def _decode_fdbaq(data, num_quads, huffman_lut):
+    """
+    Extract the sample codes from an FDBAQ encoded packet.
+
+    Data is arranged as four channels (IE, IO, QE, QO) of Huffman encoded
+    sample codes, each starting on a 16-bit word boundary. Channels are
+    split into blocks of 128 codes. Each IE block starts with a 3-bit
+    Bit Rate Code, and each QE block with an 8-bit Threshold Index.
+
+    Args:
+        data:           The user data payload followed by _PADDING, as a uint8 array or bytes
+        num_quads:      Number of codes in each channel
+        huffman_lut:    Sample code lookup table from _build_huffman_lut, as an array or list
+
+    Returns:
+        The sign bits as a (4, num_quads) uint8 array, one row per channel
+        The magnitude codes as a (4, num_quads) uint8 array
+        The BRC of each block
+        The THIDX of each block
+    """
+    num_baq_blocks = (num_quads + 127) // 128
+    signs = np.zeros((4, num_quads), dtype=np.uint8)
+    mcodes = np.zeros((4, num_quads), dtype=np.uint8)
+    brcs = np.zeros(num_baq_blocks, dtype=np.uint8)
+    thidxs = np.zeros(num_baq_blocks, dtype=np.uint8)
+    num_bits = (len(data) - len(_PADDING)) * 8
+
+    bit_pos = 0
+    for channel in range(4):
+        channel_signs = signs[channel]
+        channel_mcodes = mcodes[channel]
+        for block_index in range(num_baq_blocks):
+            if channel == 0:
+                brcs[block_index] = _peek_bits(data, bit_pos, 3)
+                bit_pos += 3
+                if brcs[block_index] > 4:
+                    raise ValueError("Unrecognized FDBAQ bit rate code")
+            elif channel == 2:
+                thidxs[block_index] = _peek_bits(data, bit_pos, 8)
+                bit_pos += 8
+
+            lut_start = int(brcs[block_index]) << _PEEK_BITS
 
-    def __init__(self, data, num_quads):
-        # TODO: Convert to proper Huffman implementation
-        self._bit_counter = 0
-        self._byte_counter = 0
-        self._data = data
-        self._num_quads = num_quads
+            # Each baq block contains 128 hcodes, except the last
+            for i in range(block_index * 128, min(block_index * 128 + 128, num_quads)):
+                if bit_pos > num_bits:
+                    raise IndexError("Ran out of data while reading FDBAQ sample codes")
+                # _peek_bits(data, bit_pos, _PEEK_BITS), written out since this is the hot loop
+                byte_index = bit_pos >> 3
+                window = (data[byte_index] << 16) | (data[byte_index + 1] << 8) | data[byte_index + 2]
+                entry = huffman_lut[lut_start | ((window >> (13 - (bit_pos & 7))) & 0x7ff)]
+                channel_mcodes[i] = entry & 0x0f
+                channel_signs[i] = (entry >> 4) & 0x01
+                bit_pos += entry >> 5
 
-        self._num_baq_blocks = math.ceil(num_quads/128)
-        self._brc = []
-        self._thidx = []
-
-        self._i_evens_scodes = []
-        self._i_odds_scodes = []
-        self._q_evens_scodes = []
-        self._q_odds_scodes = []
-        
-        logging.debug(f"Created FDBAQ decoder. Numquads={num_quads} NumBAQblocks={self._num_baq_blocks}")
-
-        # TODO: Lots of repetition here, break into function(s)
-        # Channel 1 - IE
-        values_processed_count = 0
-        for block_index in range(self._num_baq_blocks):
-            logging.debug(f"Starting IE block {block_index+1} of {self._num_baq_blocks}, processing {min(128, self._num_quads-values_processed_count)} vals")
-
-            # Each Bit Rate Code is in the first three bits of each IE block
-            brc = self._read_brc()
-            self._brc.append(brc)
-
-            # The BRC determines which type of Huffman encoding we're using
-            # Ref. SAR Space Protocol Data Unit p.71
-            if self._brc[block_index] == 0:
-                this_huffman_tree = _TREE_BRC_ZERO
-            elif self._brc[block_index] == 1:
-                this_huffman_tree = _TREE_BRC_ONE
-            elif self._brc[block_index] == 2:
-                this_huffman_tree = _TREE_BRC_TWO
-            elif self._brc[block_index] == 3:
-                this_huffman_tree = _TREE_BRC_THREE
-            elif self._brc[block_index] == 4:
-                this_huffman_tree = _TREE_BRC_FOUR
-            else:
-                logging.error(f"Unrecognized BAQ mode code {self._brc[block_index]}")
+        if bit_pos > num_bits:
+            raise IndexError("Ran out of data while reading FDBAQ sample codes")
 
-            # Each baq block contains 128 hcodes, except the last
-            for i in range(min(128, self._num_quads-values_processed_count)):
-                sign = self._next_bit()
-
-                # Recursively step through our Huffman tree.
-                # We know we've reached the end when our current node is an
-                # integer rather than a tuple.
-                current_node = this_huffman_tree
-                while not isinstance(current_node, int):
-                    current_node = current_node[self._next_bit()]
-                    if current_node is None:
-                        raise ValueError
-                self._i_evens_scodes.append(SampleCode(sign, current_node))
-                values_processed_count = values_processed_count+1
-
-        # Channel 2 - IO
-        # Move counters to next 16-bit word boundary
-        logging.debug(f"Finished block: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        if not self._bit_counter == 0:
-            self._bit_counter = 0
-            self._byte_counter += 1
-        self._byte_counter = math.ceil(self._byte_counter / 2) * 2
-        logging.debug(f"Moved counters: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        
-        values_processed_count = 0
-        for block_index in range(self._num_baq_blocks):
-            logging.debug(f"Starting IO block {block_index+1} of {self._num_baq_blocks}, processing {min(128, self._num_quads-values_processed_count)} vals")
-
-            # The BRC determines which type of Huffman encoding we're using
-            # Ref. SAR Space Protocol Data Unit p.71
-            if self._brc[block_index] == 0:
-                this_huffman_tree = _TREE_BRC_ZERO
-            elif self._brc[block_index] == 1:
-                this_huffman_tree = _TREE_BRC_ONE
-            elif self._brc[block_index] == 2:
-                this_huffman_tree = _TREE_BRC_TWO
-            elif self._brc[block_index] == 3:
-                this_huffman_tree = _TREE_BRC_THREE
-            elif self._brc[block_index] == 4:
-                this_huffman_tree = _TREE_BRC_FOUR
-            else:
-                logging.error(f"Unrecognized BAQ mode code {self._brc[block_index]}")
+        # Move to next 16-bit word boundary
+        bit_pos = (bit_pos + 15) & ~15
 
-            # Each baq block contains 128 hcodes, except the last
-            for i in range(min(128, self._num_quads-values_processed_count)):
-                sign = self._next_bit()
-
-                # Recursively step through our Huffman tree.
-                # We know we've reached the end when our current node is an
-                # integer rather than a tuple.
-                current_node = this_huffman_tree
-                while not isinstance(current_node, int):
-                    current_node = current_node[self._next_bit()]
-                    if current_node is None:
-                        raise ValueError
-                self._i_odds_scodes.append(SampleCode(sign, current_node))
-                values_processed_count = values_processed_count+1
-
-        # Channel 3 -QE
-        # Move counters to next 16-bit word boundary
-        logging.debug(f"Finished block: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        if not self._bit_counter == 0:
-            self._bit_counter = 0
-            self._byte_counter += 1
-        self._byte_counter = math.ceil(self._byte_counter / 2) * 2
-        logging.debug(f"Moved counters: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        
-        values_processed_count = 0
-        for block_index in range(self._num_baq_blocks):
-            logging.debug(f"Starting QE block {block_index+1} of {self._num_baq_blocks}, processing {min(128, self._num_quads-values_processed_count)} vals")
-
-            # Each THIDX Code is in the first eight bits of each IE block
-            this_thidx = self._read_thidx()
-            self._thidx.append(this_thidx)
-
-            # The BRC determines which type of Huffman encoding we're using
-            # Ref. SAR Space Protocol Data Unit p.71
-            if self._brc[block_index] == 0:
-                this_huffman_tree = _TREE_BRC_ZERO
-            elif self._brc[block_index] == 1:
-                this_huffman_tree = _TREE_BRC_ONE
-            elif self._brc[block_index] == 2:
-                this_huffman_tree = _TREE_BRC_TWO
-            elif self._brc[block_index] == 3:
-                this_huffman_tree = _TREE_BRC_THREE
-            elif self._brc[block_index] == 4:
-                this_huffman_tree = _TREE_BRC_FOUR
-            else:
-                logging.error(f"Unrecognized BAQ mode code {self._brc[block_index]}")
+    return signs, mcodes, brcs, thidxs
 
-            # Each baq block contains 128 hcodes, except the last
-            for i in range(min(128, self._num_quads-values_processed_count)):
-                sign = self._next_bit()
-
-                # Recursively step through our Huffman tree.
-                # We know we've reached the end when our current node is an
-                # integer rather than a tuple.
-                current_node = this_huffman_tree
-                while not isinstance(current_node, int):
-                    current_node = current_node[self._next_bit()]
-                    if current_node is None:
-                        raise ValueError
-                self._q_evens_scodes.append(SampleCode(sign, current_node))
-                values_processed_count = values_processed_count+1
-
-        # Channel 4 - QO
-        # Move counters to next 16-bit word boundary
-        logging.debug(f"Finished block: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        if not self._bit_counter == 0:
-            self._bit_counter = 0
-            self._byte_counter += 1
-        self._byte_counter = math.ceil(self._byte_counter / 2) * 2
-        logging.debug(f"Moved counters: bit_counter={self._bit_counter} byte_counter={self._byte_counter}")
-        
-        values_processed_count = 0
-        for block_index in range(self._num_baq_blocks):
-            logging.debug(f"Starting QO block {block_index+1} of {self._num_baq_blocks}, processing {min(128, self._num_quads-values_processed_count)} vals")
-
-            # The BRC determines which type of Huffman encoding we're using
-            # Ref. SAR Space Protocol Data Unit p.71
-            if self._brc[block_index] == 0:
-                this_huffman_tree = _TREE_BRC_ZERO
-            elif self._brc[block_index] == 1:
-                this_huffman_tree = _TREE_BRC_ONE
-            elif self._brc[block_index] == 2:
-                this_huffman_tree = _TREE_BRC_TWO
-            elif self._brc[block_index] == 3:
-                this_huffman_tree = _TREE_BRC_THREE
-            elif self._brc[block_index] == 4:
-                this_huffman_tree = _TREE_BRC_FOUR
-            else:
-                logging.error(f"Unrecognized BAQ mode code {self._brc[block_index]}")
 
-            # Each baq block contains 128 hcodes, except the last
-            for i in range(min(128, self._num_quads-values_processed_count)):
-                sign = self._next_bit()
-
-                # Recursively step through our Huffman tree.
-                # We know we've reached the end when our current node is an
-                # integer rather than a tuple.
-                current_node = this_huffman_tree
-                while not isinstance(current_node, int):
-                    current_node = current_node[self._next_bit()]
-                    if current_node is None:
-                        raise ValueError
-                self._q_odds_scodes.append(SampleCode(sign, current_node))
-                values_processed_count = values_processed_count+1
+class FDBAQDecoder:
+    """Extracts sample codes from Sentinel-1 packets."""
+
+    __slots__ = ('_num_quads', '_num_baq_blocks', '_signs', '_mcodes', '_brc', '_thidx')
+
+    def __init__(self, data, num_quads):
+        self._num_quads = num_quads
+        self._num_baq_blocks = (num_quads + 127) // 128
+        logging.debug("Created FDBAQ decoder. Numquads=%s NumBAQblocks=%s", num_quads, self._num_baq_blocks)
+
+        # Sample codes are stored as parallel arrays of sign bits and
+        # magnitude codes, one row per channel.
+        data = bytes(data) + _PADDING
+        if HAVE_NUMBA:
+            data, huffman_lut = np.frombuffer(data, dtype=np.uint8), _HUFFMAN_LUT
+        else:
+            huffman_lut = _HUFFMAN_LUT_LIST
+        self._signs, self._mcodes, self._brc, self._thidx = _decode_fdbaq(data, num_quads, huffman_lut)
 
     @property
     def get_brcs(self):
-        """Get the extracted list of Bit Rate Codes (BRCs)."""
+        """Get the extracted array of Bit Rate Codes (BRCs)."""
         return self._brc
 
     @property
     def get_thidxs(self):
-        """Get the extracted list of Threshold Index codes (THIDXs)."""
+        """Get the extracted array of Threshold Index codes (THIDXs)."""
         return self._thidx
 
+    @property
+    def get_sample_codes(self):
+        """Get the sign bits and magnitude codes of all four channels, one row per channel."""
+        return self._signs, self._mcodes
+
     @property
     def get_s_ie(self):
-        """Get the even-indexed I channel data."""
-        return self._i_evens_scodes
+        """Get the even-indexed I channel sign bits and magnitude codes."""
+        return self._signs[0], self._mcodes[0]
 
     @property
     def get_s_io(self):
-        """Get the odd-indexed I channel data."""
-        return self._i_odds_scodes
+        """Get the odd-indexed I channel sign bits and magnitude codes."""
+        return self._signs[1], self._mcodes[1]
 
     @property
     def get_s_qe(self):
-        """Get the even-indexed Q channel data."""
-        return self._q_evens_scodes
+        """Get the even-indexed Q channel sign bits and magnitude codes."""
+        return self._signs[2], self._mcodes[2]
 
     @property
     def get_s_qo(self):
-        """Get the odd-indexed Q channel data."""
-        return self._q_odds_scodes
-
-    def _next_bit(self):
-        bit = (self._data[self._byte_counter] >> (7-self._bit_counter)) & 0x01
-        self._bit_counter = (self._bit_counter + 1) % 8
-        if self._bit_counter == 0:
-            self._byte_counter += 1
-        return bit
-
-    def _read_thidx(self):
-        residual = 0
-        for i in range(8):
-            residual = residual << 1
-            residual += self._next_bit()
-        return residual
-
-    def _read_brc(self):
-        residual = 0
-        for i in range(3):
-            residual = residual << 1
-            residual += self._next_bit()
-        return residual
+        """Get the odd-indexed Q channel sign bits and magnitude codes."""
+        return self._signs[3], self._mcodes[3]
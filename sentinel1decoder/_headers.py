@@ -5,16 +5,87 @@ Created on Thu Jun 30 18:34:01 2022.
 @author: richa
 """
 import logging
+import struct
+
+import numpy as np
 
 from . import constants as cnst
 
+# Scale factors for fields measured in units of F_REF, precomputed so each
+# field is scaled with a multiplication rather than a division.
+_INV_F_REF = 1/cnst.F_REF
+_INV_4_F_REF = 1/(4*cnst.F_REF)
+_TXPRR_SCALE = cnst.F_REF**2/2**21
+_TXPSF_SCALE = cnst.F_REF/2**14
+
+# The primary header is three big-endian 16-bit words
+_PRIMARY_HEADER_STRUCT = struct.Struct('>HHH')
+
+# Byte layout of the secondary header. Unused bytes are skipped with pad
+# bytes, and 24-bit fields are read as a high byte and a low 16-bit word.
+_SECONDARY_HEADER_STRUCT = struct.Struct(
+    '>'
+    'IH'        # Datation service
+    'IIBBI'     # Fixed ancillary data field
+    'BH'        # Sub-commutated ancillary data service
+    'II'        # Counters service
+    'BBxBBHHBHBBHBHBHB2xBBB'  # Radar configuration support service
+    'Hx'        # Radar sample count service
+)
+
+# Field names of the values returned by decode_primary_header_values
+PRIMARY_HEADER_FIELDS = (
+    cnst.PACKET_VER_NUM_FIELD_NAME,
+    cnst.PACKET_TYPE_FIELD_NAME,
+    cnst.SECONDARY_HEADER_FIELD_NAME,
+    cnst.PID_FIELD_NAME,
+    cnst.PCAT_FIELD_NAME,
+    cnst.SEQUENCE_FLAGS_FIELD_NAME,
+    cnst.PACKET_SEQUENCE_COUNT_FIELD_NAME,
+    cnst.PACKET_DATA_LEN_FIELD_NAME,
+)
+
+# Field names of the values returned by decode_secondary_header_values
+SECONDARY_HEADER_FIELDS = (
+    cnst.COARSE_TIME_FIELD_NAME,
+    cnst.FINE_TIME_FIELD_NAME,
+    cnst.SYNC_FIELD_NAME,
+    cnst.DATA_TAKE_ID_FIELD_NAME,
+    cnst.ECC_NUM_FIELD_NAME,
+    cnst.TEST_MODE_FIELD_NAME,
+    cnst.RX_CHAN_ID_FIELD_NAME,
+    cnst.INSTRUMENT_CONFIG_ID_FIELD_NAME,
+    cnst.SUBCOM_ANC_DATA_WORD_INDEX_FIELD_NAME,
+    cnst.SUBCOM_ANC_DATA_WORD_FIELD_NAME,
+    cnst.SPACE_PACKET_COUNT_FIELD_NAME,
+    cnst.PRI_COUNT_FIELD_NAME,
+    cnst.ERROR_FLAG_FIELD_NAME,
+    cnst.BAQ_MODE_FIELD_NAME,
+    cnst.BAQ_BLOCK_LEN_FIELD_NAME,
+    cnst.RANGE_DEC_FIELD_NAME,
+    cnst.RX_GAIN_FIELD_NAME,
+    cnst.TX_RAMP_RATE_FIELD_NAME,
+    cnst.TX_PULSE_START_FREQ_FIELD_NAME,
+    cnst.TX_PULSE_LEN_FIELD_NAME,
+    cnst.RANK_FIELD_NAME,
+    cnst.PRI_FIELD_NAME,
+    cnst.SWST_FIELD_NAME,
+    cnst.SWL_FIELD_NAME,
+    cnst.SAS_SSB_FLAG_FIELD_NAME,
+    cnst.POLARIZATION_FIELD_NAME,
+    cnst.TEMP_COMP_FIELD_NAME,
+    cnst.CAL_MODE_FIELD_NAME,
+    cnst.TX_PULSE_NUM_FIELD_NAME,
+    cnst.SIGNAL_TYPE_FIELD_NAME,
+    cnst.SWAP_FLAG_FIELD_NAME,
+    cnst.SWATH_NUM_FIELD_NAME,
+    cnst.NUM_QUADS_FIELD_NAME,
+)
+
 
 def decode_primary_header(header_bytes: bytes) -> dict:
     """Decode the Sentinel-1 Space Packet primary header.
 
-    Refer to SAR Space Protocol Data Unit specification document pg.13
-    The primary header consists of exactly 6 bytes.
-
     Parameters
     ----------
     header_bytes : List
@@ -26,46 +97,69 @@ def decode_primary_header(header_bytes: bytes) -> dict:
         Dictionary of primary header fields.
 
     """
-    if not len(header_bytes) == 6:
-        logging.ERROR("Primary header must be exactly 6 bytes")
-        raise Exception(f"Primary header must be exactly 6 bytes. Received {len(header_bytes)} bytes.")
+    return dict(zip(PRIMARY_HEADER_FIELDS, decode_primary_header_values(header_bytes)))
+
+
+def decode_primary_header_values(header_bytes: bytes) -> tuple:
+    """Decode the Sentinel-1 Space Packet primary header.
+
+    Refer to SAR Space Protocol Data Unit specification document pg.13
+    The primary header consists of exactly 6 bytes.
+
+    Args:
+        header_bytes: Set of input bytes. Must contain exactly 6 bytes.
+
+    Returns:
+        A tuple of primary header fields, in the order of PRIMARY_HEADER_FIELDS.
+    """
+    try:
+        word0, word1, word2 = _PRIMARY_HEADER_STRUCT.unpack(header_bytes)
+    except struct.error:
+        raise ValueError(f"Primary header must be exactly 6 bytes. Received {len(header_bytes)} bytes.") from None
 
-    tmp16 = int.from_bytes(header_bytes[:2], 'big')
-    packet_version_number = tmp16 >> 13  # Bit 0-2
-    packet_type = (tmp16 >> 12) & 0x01  # Bit 3
-    secondary_header_flag = (tmp16 >> 11) & 0x01  # Bit 4
-    process_id = (tmp16 >> 4) & 0x7f  # Bit 5-11
-    packet_category = tmp16 & 0xf  # Bit 12-15
+    packet_version_number = word0 >> 13  # Bit 0-2
+    packet_type = (word0 >> 12) & 0x01  # Bit 3
+    secondary_header_flag = (word0 >> 11) & 0x01  # Bit 4
+    process_id = (word0 >> 4) & 0x7f  # Bit 5-11
+    packet_category = word0 & 0xf  # Bit 12-15
 
-    tmp16 = int.from_bytes(header_bytes[2:4], 'big')
-    sequence_flags = tmp16 >> 14  # Bit 0-1
-    packet_sequence_count = tmp16 & 0x3f  # Bit 2-15
+    sequence_flags = word1 >> 14  # Bit 0-1
+    packet_sequence_count = word1 & 0x3f  # Bit 2-15
 
-    tmp16 = int.from_bytes(header_bytes[4:], 'big')
-    packet_data_length = tmp16+1  # Bit 0-15
+    packet_data_length = word2+1  # Bit 0-15
 
     # Total space packet length must be a multiple of 4 bytes.
     # Packet length = 6 primary header bytes + packet data length
     if not (packet_data_length + 6) % 4 == 0:
         logging.error("Packet length is not a multiple of 4 bytes")
 
-    output_dictionary = {
-        cnst.PACKET_VER_NUM_FIELD_NAME: packet_version_number,
-        cnst.PACKET_TYPE_FIELD_NAME: packet_type,
-        cnst.SECONDARY_HEADER_FIELD_NAME: secondary_header_flag,
-        cnst.PID_FIELD_NAME: process_id,
-        cnst.PCAT_FIELD_NAME: packet_category,
-        cnst.SEQUENCE_FLAGS_FIELD_NAME: sequence_flags,
-        cnst.PACKET_SEQUENCE_COUNT_FIELD_NAME: packet_sequence_count,
-        cnst.PACKET_DATA_LEN_FIELD_NAME: packet_data_length
-    }
-
-    return output_dictionary
+    return (
+        packet_version_number,
+        packet_type,
+        secondary_header_flag,
+        process_id,
+        packet_category,
+        sequence_flags,
+        packet_sequence_count,
+        packet_data_length,
+    )
 
 
 def decode_secondary_header(header_bytes: bytes) -> dict:
     """Decode the Sentinel-1 Space Packet secondary header.
 
+    Args:
+        header_bytes: Set of input bytes. Must contain exactly 62 bytes.
+
+    Returns:
+        A dictionary of secondary header fields.
+    """
+    return dict(zip(SECONDARY_HEADER_FIELDS, decode_secondary_header_values(header_bytes)))
+
+
+def decode_secondary_header_values(header_bytes: bytes) -> tuple:
+    """Decode the Sentinel-1 Space Packet secondary header.
+
     Refer to SAR Space Protocol Data Unit specification document pg.14
     The secondary header consists of exactly 62 bytes.
 
@@ -73,47 +167,34 @@ def decode_secondary_header(header_bytes: bytes) -> dict:
         header_bytes: Set of input bytes. Must contain exactly 62 bytes.
 
     Returns:
-        A dictionary of secondary header fields.
+        A tuple of secondary header fields, in the order of SECONDARY_HEADER_FIELDS.
     """
-    if not len(header_bytes) == 62:
-        logging.ERROR("Secondary header must be exactly 62 bytes")
-        raise Exception(f"Secondary header must be exactly 62 bytes. Received {len(header_bytes)} bytes.")
+    try:
+        (
+            coarse_time, fine_time_word,
+            sync, data_take_id, ecc_number, test_rx_byte, instrument_config_id,
+            subcom_data_word_ind, subcom_data_word,
+            space_packet_count, pri_count,
+            error_baq_byte, baq_block_length, range_decimation, rx_gain_code,
+            txprr_word, txpsf_word, tx_pulse_length_hi, tx_pulse_length_lo,
+            rank_byte, pri_hi, pri_lo, swst_hi, swst_lo, swl_hi, swl_lo, sas_byte,
+            cal_byte, signal_byte, swath_number,
+            number_of_quads,
+        ) = _SECONDARY_HEADER_STRUCT.unpack(header_bytes)
+    except struct.error:
+        raise ValueError(f"Secondary header must be exactly 62 bytes. Received {len(header_bytes)} bytes.") from None
 
     # ---------------------------------------------------------
     # Datation service (6 bytes)
     # ---------------------------------------------------------
-    coarse_time = int.from_bytes(header_bytes[:4], 'big')
-
-    fine_time = (int.from_bytes(header_bytes[4:6], 'big') + 0.5)*(2**(-16))
-
-    output_dictionary = {
-        cnst.COARSE_TIME_FIELD_NAME: coarse_time,
-        cnst.FINE_TIME_FIELD_NAME: fine_time
-    }
+    fine_time = (fine_time_word + 0.5)*(2**(-16))
 
     # ---------------------------------------------------------
     # Fixed ancillary data field (14 bytes)
     # ---------------------------------------------------------
-    sync = int.from_bytes(header_bytes[6:10], 'big')
-
-    data_take_id = int.from_bytes(header_bytes[10:14], 'big')
-
-    ecc_number = header_bytes[14]
-
     # Byte 15 bit 1 is unused
-    test_mode = (header_bytes[15] >> 4) & 0x07  # Byte 15 Bits 1-3
-    rx_channel_id = header_bytes[15] & 0x0f  # Byte 15 Bits 4-7
-
-    instrument_config_id = int.from_bytes(header_bytes[16:20], 'big')
-
-    output_dictionary.update({
-        cnst.SYNC_FIELD_NAME: sync,
-        cnst.DATA_TAKE_ID_FIELD_NAME: data_take_id,
-        cnst.ECC_NUM_FIELD_NAME: ecc_number,
-        cnst.TEST_MODE_FIELD_NAME: test_mode,
-        cnst.RX_CHAN_ID_FIELD_NAME: rx_channel_id,
-        cnst.INSTRUMENT_CONFIG_ID_FIELD_NAME: instrument_config_id
-    })
+    test_mode = (test_rx_byte >> 4) & 0x07  # Byte 15 Bits 1-3
+    rx_channel_id = test_rx_byte & 0x0f  # Byte 15 Bits 4-7
 
     if sync != 0x352EF853:
         logging.error("Sync marker != 352EF853")
@@ -125,121 +206,200 @@ def decode_secondary_header(header_bytes: bytes) -> dict:
     # than the space packet generation rate (up to 1Hz). Data is
     # thus subcommed in portions of 2 bytes per space packet.
     # The full data frame is 42 bytes long.
-    subcom_data_word_ind = header_bytes[20]
-
-    subcom_data_word = int.from_bytes(header_bytes[21:23], 'big')
-
-    output_dictionary.update({
-        cnst.SUBCOM_ANC_DATA_WORD_INDEX_FIELD_NAME: subcom_data_word_ind,
-        cnst.SUBCOM_ANC_DATA_WORD_FIELD_NAME: subcom_data_word
-    })
-
-    # ---------------------------------------------------------
-    # Counters Service (8 bytes)
-    # ---------------------------------------------------------
-    space_packet_count = int.from_bytes(header_bytes[23:27], 'big')
-
-    pri_count = int.from_bytes(header_bytes[27:31], 'big')
-
-    output_dictionary.update({
-        cnst.SPACE_PACKET_COUNT_FIELD_NAME: space_packet_count,
-        cnst.PRI_COUNT_FIELD_NAME: pri_count
-    })
 
     # ---------------------------------------------------------
     # Radar configuration support service (27 bytes)
     # ---------------------------------------------------------
-    error_flag = header_bytes[31] >> 7  # Byte 31 Bit 0
+    error_flag = error_baq_byte >> 7  # Byte 31 Bit 0
     # Byte 31 Bits 1-2 are unused.
-    baq_mode = header_bytes[31] & 0x1f  # Byte 31 Bits 3-7
-
-    baq_block_length = header_bytes[32]
+    baq_mode = error_baq_byte & 0x1f  # Byte 31 Bits 3-7
 
     # The byte at packet_data[33] is unused
 
-    range_decimation = header_bytes[34]
-
-    rx_gain = header_bytes[35]*-0.5
+    rx_gain = rx_gain_code*-0.5
 
-    tmp16 = int.from_bytes(header_bytes[36:38], 'big')
-    txprr_sign = ((-1)**(1-(tmp16 >> 15)))
-    txprr = txprr_sign*(tmp16 & 0x7fff)*(cnst.F_REF**2)/(2**21)
+    # A set sign bit means positive: map bit 15 from {0, 1} to {-1, +1}
+    txprr_sign = ((txprr_word >> 14) & 2) - 1
+    txprr = txprr_sign*(txprr_word & 0x7fff)*_TXPRR_SCALE
 
-    tmp16 = int.from_bytes(header_bytes[38:40], 'big')
-    txpsf_additive = (txprr/(4*cnst.F_REF))
-    txpsf_sign = ((-1)**(1-(tmp16 >> 15)))
-    txpsf = txpsf_additive+txpsf_sign*(tmp16 & 0x7fff)*cnst.F_REF/(2**14)
+    txpsf_additive = txprr*_INV_4_F_REF
+    txpsf_sign = ((txpsf_word >> 14) & 2) - 1
+    txpsf = txpsf_additive+txpsf_sign*(txpsf_word & 0x7fff)*_TXPSF_SCALE
 
-    tmp24 = int.from_bytes(header_bytes[40:43], 'big')
-    tx_pulse_length = tmp24/cnst.F_REF
+    tx_pulse_length = ((tx_pulse_length_hi << 16) | tx_pulse_length_lo)*_INV_F_REF
 
     # Byte 43 bits 0-2 are unused
-    rank = header_bytes[43] & 0x1f  # Byte 43 bits 3-7
+    rank = rank_byte & 0x1f  # Byte 43 bits 3-7
 
-    tmp24 = int.from_bytes(header_bytes[44:47], 'big')
-    pri = tmp24 / cnst.F_REF
+    pri = ((pri_hi << 16) | pri_lo)*_INV_F_REF
 
-    tmp24 = int.from_bytes(header_bytes[47:50], 'big')
-    sampling_window_start_time = tmp24 / cnst.F_REF
+    sampling_window_start_time = ((swst_hi << 16) | swst_lo)*_INV_F_REF
 
-    tmp24 = int.from_bytes(header_bytes[50:53], 'big')
-    sampling_window_length = tmp24/cnst.F_REF
+    sampling_window_length = ((swl_hi << 16) | swl_lo)*_INV_F_REF
 
-    sas_ssbflag = header_bytes[53] >> 7  # Byte 53 Bit 0
-    polarisation = (header_bytes[53] >> 4) & 0x07  # Byte 53 Bits 1-3
-    temperature_comp = (header_bytes[53] >> 2) & 0x03  # Byte 53 Bits 4-5
+    sas_ssbflag = sas_byte >> 7  # Byte 53 Bit 0
+    polarisation = (sas_byte >> 4) & 0x07  # Byte 53 Bits 1-3
+    temperature_comp = (sas_byte >> 2) & 0x03  # Byte 53 Bits 4-5
     # Byte 53 Bits 6-7 are unused
 
     # Some extra unimplemented stuff here.
     # Exact fields used depends on the value of sas_ssbflag
     # TODO: Implement sas_ssb_message decoding
 
-    calibration_mode = header_bytes[56] >> 6  # Byte 56 Bits 0-1
+    calibration_mode = cal_byte >> 6  # Byte 56 Bits 0-1
     # Byte 56 Bit 2 is unused
-    tx_pulse_number = header_bytes[56] & 0x1f  # Byte 56 Bits 3-7
+    tx_pulse_number = cal_byte & 0x1f  # Byte 56 Bits 3-7
 
-    signal_type = header_bytes[57] >> 4  # Byte 57 Bits 0-3
+    signal_type = signal_byte >> 4  # Byte 57 Bits 0-3
     # Byte 57 Bits 4-6 are unused
-    swap_flag = header_bytes[57] & 0x01  # Byte 57 Bit 7
-
-    swath_number = header_bytes[58]
-
-    output_dictionary.update({
-        cnst.ERROR_FLAG_FIELD_NAME: error_flag,
-        cnst.BAQ_MODE_FIELD_NAME: baq_mode,
-        cnst.BAQ_BLOCK_LEN_FIELD_NAME: baq_block_length,
-        cnst.RANGE_DEC_FIELD_NAME: range_decimation,
-        cnst.RX_GAIN_FIELD_NAME: rx_gain,
-        cnst.TX_RAMP_RATE_FIELD_NAME: txprr,
-        cnst.TX_PULSE_START_FREQ_FIELD_NAME: txpsf,
-        cnst.TX_PULSE_LEN_FIELD_NAME: tx_pulse_length,
-        cnst.RANK_FIELD_NAME: rank,
-        cnst.PRI_FIELD_NAME: pri,
-        cnst.SWST_FIELD_NAME: sampling_window_start_time,
-        cnst.SWL_FIELD_NAME: sampling_window_length,
-        cnst.SAS_SSB_FLAG_FIELD_NAME: sas_ssbflag,
-        cnst.POLARIZATION_FIELD_NAME: polarisation,
-        cnst.TEMP_COMP_FIELD_NAME: temperature_comp,
-        cnst.CAL_MODE_FIELD_NAME: calibration_mode,
-        cnst.TX_PULSE_NUM_FIELD_NAME: tx_pulse_number,
-        cnst.SIGNAL_TYPE_FIELD_NAME: signal_type,
-        cnst.SWAP_FLAG_FIELD_NAME: swap_flag,
-        cnst.SWATH_NUM_FIELD_NAME: swath_number
-    })
+    swap_flag = signal_byte & 0x01  # Byte 57 Bit 7
+
+    # The byte at packet_data[61] is unused
 
     # ---------------------------------------------------------
-    # Radar sample count service (3 bytes)
+    # End of secondary header information
     # ---------------------------------------------------------
-    number_of_quads = int.from_bytes(header_bytes[59:61], 'big')
 
-    # The byte at packet_data[61] is unused
+    return (
+        coarse_time,
+        fine_time,
+        sync,
+        data_take_id,
+        ecc_number,
+        test_mode,
+        rx_channel_id,
+        instrument_config_id,
+        subcom_data_word_ind,
+        subcom_data_word,
+        space_packet_count,
+        pri_count,
+        error_flag,
+        baq_mode,
+        baq_block_length,
+        range_decimation,
+        rx_gain,
+        txprr,
+        txpsf,
+        tx_pulse_length,
+        rank,
+        pri,
+        sampling_window_start_time,
+        sampling_window_length,
+        sas_ssbflag,
+        polarisation,
+        temperature_comp,
+        calibration_mode,
+        tx_pulse_number,
+        signal_type,
+        swap_flag,
+        swath_number,
+        number_of_quads,
+    )
+
+
+def decode_headers(header_bytes: np.ndarray) -> dict:
+    """Decode the primary and secondary headers of many packets at once.
+
+    Each field is decoded for all packets with whole-array operations,
+    giving the same values as decode_primary_header_values and
+    decode_secondary_header_values.
+
+    Args:
+        header_bytes: A uint8 array with one row of 68 header bytes per
+                      packet, the 6 byte primary header followed by the
+                      62 byte secondary header.
 
-    output_dictionary.update({
-        cnst.NUM_QUADS_FIELD_NAME: number_of_quads
-    })
+    Returns:
+        A dictionary of arrays of header field values, in the order of
+        PRIMARY_HEADER_FIELDS followed by SECONDARY_HEADER_FIELDS.
+    """
+    if not header_bytes.ndim == 2 or not header_bytes.shape[1] == 68:
+        raise ValueError(f"Headers must be rows of exactly 68 bytes. Received shape {header_bytes.shape}.")
+
+    def field(start, stop):
+        """Combine the big-endian bytes [start, stop) of each row into an integer."""
+        if stop - start == 1:
+            return header_bytes[:, start].astype(np.int64)
+        # Load whole 16 or 32-bit big-endian words. 24-bit fields load the
+        # following byte too, which is then shifted off.
+        load_bytes = 2 if stop - start == 2 else 4
+        words = np.ascontiguousarray(header_bytes[:, start:start + load_bytes]).view(f'>u{load_bytes}')[:, 0]
+        return (words >> (8 * (start + load_bytes - stop))).astype(np.int64)
 
     # ---------------------------------------------------------
-    # End of secondary header information
+    # Primary header (6 bytes)
     # ---------------------------------------------------------
+    word0, word1, word2 = field(0, 2), field(2, 4), field(4, 6)
+    packet_data_length = word2 + 1
 
-    return output_dictionary
+    bad_length = np.flatnonzero((packet_data_length + 6) % 4)
+    if len(bad_length):
+        logging.error("Packet length is not a multiple of 4 bytes in %d packets, first at packet %d", len(bad_length), bad_length[0])
+
+    # ---------------------------------------------------------
+    # Secondary header (62 bytes), offset by the primary header
+    # ---------------------------------------------------------
+    sync = field(12, 16)
+    bad_sync = np.flatnonzero(sync != 0x352EF853)
+    if len(bad_sync):
+        logging.error("Sync marker != 352EF853 in %d packets, first at packet %d", len(bad_sync), bad_sync[0])
+
+    test_rx_byte = field(21, 22)
+    error_baq_byte = field(37, 38)
+    sas_byte = field(59, 60)
+    cal_byte = field(62, 63)
+    signal_byte = field(63, 64)
+
+    txprr_word = field(42, 44)
+    txprr_sign = ((txprr_word >> 14) & 2) - 1
+    txprr = txprr_sign*(txprr_word & 0x7fff)*_TXPRR_SCALE
+
+    txpsf_word = field(44, 46)
+    txpsf_additive = txprr*_INV_4_F_REF
+    txpsf_sign = ((txpsf_word >> 14) & 2) - 1
+    txpsf = txpsf_additive+txpsf_sign*(txpsf_word & 0x7fff)*_TXPSF_SCALE
+
+    values = (
+        word0 >> 13,
+        (word0 >> 12) & 0x01,
+        (word0 >> 11) & 0x01,
+        (word0 >> 4) & 0x7f,
+        word0 & 0xf,
+        word1 >> 14,
+        word1 & 0x3f,
+        packet_data_length,
+        field(6, 10),
+        (field(10, 12) + 0.5)*(2**(-16)),
+        sync,
+        field(16, 20),
+        field(20, 21),
+        (test_rx_byte >> 4) & 0x07,
+        test_rx_byte & 0x0f,
+        field(22, 26),
+        field(26, 27),
+        field(27, 29),
+        field(29, 33),
+        field(33, 37),
+        error_baq_byte >> 7,
+        error_baq_byte & 0x1f,
+        field(38, 39),
+        field(40, 41),
+        field(41, 42)*-0.5,
+        txprr,
+        txpsf,
+        field(46, 49)*_INV_F_REF,
+        field(49, 50) & 0x1f,
+        field(50, 53)*_INV_F_REF,
+        field(53, 56)*_INV_F_REF,
+        field(56, 59)*_INV_F_REF,
+        sas_byte >> 7,
+        (sas_byte >> 4) & 0x07,
+        (sas_byte >> 2) & 0x03,
+        cal_byte >> 6,
+        cal_byte & 0x1f,
+        signal_byte >> 4,
+        signal_byte & 0x01,
+        field(64, 65),
+        field(65, 67),
+    )
+    return dict(zip(PRIMARY_HEADER_FIELDS + SECONDARY_HEADER_FIELDS, values))
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Optional JIT compilation of hot loops.
+
+Numba is an optional dependency, installed with the "fast" extra. When it
+isn't available, functions decorated with njit run as plain Python.
+"""
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit which returns the function uncompiled."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
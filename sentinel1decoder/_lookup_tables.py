@@ -4,32 +4,39 @@ Created on Fri Jul  1 22:31:09 2022.
 
 @author: richa
 """
+import numpy as np
+
+# Simple reconstruction parameters per BRC, pg 78. The simple method is used
+# for THIDX values up to the limit, and the largest magnitude code is
+# reconstructed using the tables below.
+simple_thidx_limit = np.array([3, 3, 5, 6, 8], dtype=np.uint8)
+simple_max_mcode = np.array([3, 4, 6, 9, 15], dtype=np.uint8)
 
 # Table for simple reconstruction method, pg 78
-b0 = [
+b0 = np.array([
     3.0,
     3.0,
     3.16,
     3.53
-]
+], dtype=np.float32)
 
-b1 = [
+b1 = np.array([
     4.0,
     4.0,
     4.08,
     4.37
-]
+], dtype=np.float32)
 
-b2 = [
+b2 = np.array([
     6.0,
     6.0,
     6.0,
     6.15,
     6.5,
     6.88
-]
+], dtype=np.float32)
 
-b3 = [
+b3 = np.array([
     9.0,
     9.0,
     9.0,
@@ -37,9 +44,9 @@ b3 = [
     9.36,
     9.50,
     10.1
-]
+], dtype=np.float32)
 
-b4 = [
+b4 = np.array([
     15.0,
     15.0,
     15.0,
@@ -49,26 +56,26 @@ b4 = [
     15.22,
     15.50,
     16.05
-]
+], dtype=np.float32)
 
 
 # Table of normalized reconstruction levels, pg 79
-nrl_b0 = [
+nrl_b0 = np.array([
     0.3637,
     1.0915,
     1.8208,
     2.6406
-]
+], dtype=np.float32)
 
-nrl_b1 = [
+nrl_b1 = np.array([
     0.3042,
     0.9127,
     1.5216,
     2.1313,
     2.8426
-]
+], dtype=np.float32)
 
-nrl_b2 = [
+nrl_b2 = np.array([
     0.2305,
     0.6916,
     1.1528,
@@ -76,9 +83,9 @@ nrl_b2 = [
     2.0754,
     2.5369,
     3.1191
-]
+], dtype=np.float32)
 
-nrl_b3 = [
+nrl_b3 = np.array([
     0.1702,
     0.5107,
     0.8511,
@@ -89,9 +96,9 @@ nrl_b3 = [
     2.5536,
     2.8942,
     3.3744
-]
+], dtype=np.float32)
 
-nrl_b4 = [
+nrl_b4 = np.array([
     0.1130,
     0.3389,
     0.5649,
@@ -108,11 +115,11 @@ nrl_b4 = [
     3.0504,
     3.2764,
     3.6623
-]
+], dtype=np.float32)
 
 
 # Table of sigma values
-sf = [
+sf = np.array([
     0.,
     0.630,
     1.250,
@@ -369,4 +376,4 @@ sf = [
     254.740,
     255.990,
     255.990
-]
+], dtype=np.float32)
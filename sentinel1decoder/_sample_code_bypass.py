@@ -7,180 +7,87 @@ Created on Fri Jul  1 10:51:14 2022.
 import math
 import numpy as np
 
-from typing import Tuple
+from typing import Tuple, Union
 
-def _ten_bit_unsigned_to_signed_int(ten_bit: int) -> int:
+def _ten_bit_unsigned_to_signed_int(ten_bit: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
     """
-    Convert a ten-bit unsigned int to a standard signed int.
+    Convert ten-bit sign and magnitude values to standard signed ints.
     
     Args:
-        ten_bit: Raw ten-bit int extracted from packet.
+        ten_bit: Raw ten-bit int extracted from packet, or a signed integer
+                 array of them.
     
     Returns:
-        A standard signed integer
+        The signed value(s), with the same shape as ten_bit
     """
-    # First bit is the sign, remaining 9 encoide the number
-    sign = (-1) ** ((ten_bit >> 9) & 0x1)
-    return sign * (ten_bit & 0x1ff)
+    # First bit is the sign, remaining 9 encode the number. Subtracting twice
+    # the magnitude when the sign bit is set negates it without branching.
+    magnitude = ten_bit & 0x1ff
+    return magnitude - ((ten_bit >> 8) & 0x2) * magnitude
 
-def decode_bypass_data(data: bytes, num_quads: int) -> Tuple[float, float, float, float]:
+def decode_bypass_data(data: bytes, num_quads: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Decode user data format type A and B (“Bypass” or “Decimation Only”).
 
     Data is simply encoded in a series of 10-bit words.
 
     Parameters
     ----------
-    data : TYPE
-        DESCRIPTION.
+    data : bytes
+        The user data payload of the packet.
     num_quads : int
-        Number of quads in the file.
+        Number of quads in the packet.
 
     Returns
     -------
-    i_evens : TYPE
-        DESCRIPTION.
-    i_odds : TYPE
-        DESCRIPTION.
-    q_evens : TYPE
-        DESCRIPTION.
-    q_odds : TYPE
-        DESCRIPTION.
+    i_evens : numpy.ndarray
+        float32 values of the even-indexed I channel samples.
+    i_odds : numpy.ndarray
+        float32 values of the odd-indexed I channel samples.
+    q_evens : numpy.ndarray
+        float32 values of the even-indexed Q channel samples.
+    q_odds : numpy.ndarray
+        float32 values of the odd-indexed Q channel samples.
 
     """
     num_words = math.ceil((10/16)*num_quads)  # No. of 16-bit words per channel
     num_bytes = 2*num_words  # No. of 8-bit bytes per channel
+    if len(data) < 4*num_bytes:
+        raise ValueError(
+            f"Bypass data for {num_quads} quads must be at least {4*num_bytes} bytes. Received {len(data)} bytes."
+        )
 
-    i_evens = np.zeros(num_quads)
-    i_odds = np.zeros(num_quads)
-    q_evens = np.zeros(num_quads)
-    q_odds = np.zeros(num_quads)
+    # All four channels share the same layout, so unpack them in one pass
+    # with one row per channel.
+    channels = np.frombuffer(data, dtype=np.uint8, count=4*num_bytes).reshape(4, num_bytes)
+    i_evens, i_odds, q_evens, q_odds = _decode_bypass_channels(channels, num_quads)
 
-    # Python doesn't have an easy way of extracting 10-bit integers.
-    # Five 8-bit bytes = 40 bits = four 10-bit words
-
-    # We're going to read in sets of five normal 8-bit bytes, and extract four
-    # 10-bit words per set. We'll need to track the indexing separately and
-    # check for the end of the file each time.
-    # TODO: There is some repetition here which could be moved into function(s)
-
-    # Channel 1 - IE
-    index_8bit = 0
-    index_10bit = 0
-    while index_10bit < num_quads:
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit] << 2 | data[index_8bit+1] >> 6) & 1023
-            i_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+1] << 4 | data[index_8bit+2] >> 4) & 1023
-            i_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+2] << 6 | data[index_8bit+3] >> 2) & 1023
-            i_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+3] << 8 | data[index_8bit+4] >> 0) & 1023
-            i_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        index_8bit += 5
-
-    # Channel 2 - IO
-    index_8bit = num_bytes
-    index_10bit = 0
-    while index_10bit < num_quads:
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit] << 2 | data[index_8bit+1] >> 6) & 1023
-            i_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+1] << 4 | data[index_8bit+2] >> 4) & 1023
-            i_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+2] << 6 | data[index_8bit+3] >> 2) & 1023
-            i_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+3] << 8 | data[index_8bit+4] >> 0) & 1023
-            i_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        index_8bit += 5
+    return i_evens, i_odds, q_evens, q_odds
 
-    # Channel 3 - QE
-    index_8bit = 2 * num_bytes
-    index_10bit = 0
-    while index_10bit < num_quads:
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit] << 2 | data[index_8bit+1] >> 6) & 1023
-            q_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+1] << 4 | data[index_8bit+2] >> 4) & 1023
-            q_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+2] << 6 | data[index_8bit+3] >> 2) & 1023
-            q_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+3] << 8 | data[index_8bit+4] >> 0) & 1023
-            q_evens[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        index_8bit += 5
+def _decode_bypass_channels(channels: np.ndarray, num_quads: int) -> np.ndarray:
+    """
+    Decode rows of 10-bit bypass words.
 
-    # Channel 4 - QO
-    index_8bit = 3 * num_bytes
-    index_10bit = 0
-    while index_10bit < num_quads:
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit] << 2 | data[index_8bit+1] >> 6) & 1023
-            q_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+1] << 4 | data[index_8bit+2] >> 4) & 1023
-            q_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+2] << 6 | data[index_8bit+3] >> 2) & 1023
-            q_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        if index_10bit < num_quads:
-            s_code = (data[index_8bit+3] << 8 | data[index_8bit+4] >> 0) & 1023
-            q_odds[index_10bit] = _ten_bit_unsigned_to_signed_int(s_code)
-            index_10bit += 1
-        else:
-            break
-        index_8bit += 5
+    Args:
+        channels: Raw bytes with one row per channel.
+        num_quads: Number of quads in each channel.
 
-    return i_evens, i_odds, q_evens, q_odds
+    Returns:
+        A float32 array of the decoded sample values with one row per channel.
+    """
+    # Five 8-bit bytes = 40 bits = four 10-bit words, so unpack each channel
+    # as groups of five bytes, zero-padding the last group where needed.
+    num_channels = channels.shape[0]
+    num_groups = math.ceil(num_quads / 4)
+    num_group_bytes = min(channels.shape[1], 5*num_groups)
+    groups = np.zeros((num_channels, 5*num_groups), dtype=np.uint16)
+    groups[:, :num_group_bytes] = channels[:, :num_group_bytes]
+    groups = groups.reshape(num_channels, num_groups, 5)
+
+    words = np.empty((num_channels, num_groups, 4), dtype=np.uint16)
+    words[..., 0] = (groups[..., 0] << 2 | groups[..., 1] >> 6) & 1023
+    words[..., 1] = (groups[..., 1] << 4 | groups[..., 2] >> 4) & 1023
+    words[..., 2] = (groups[..., 2] << 6 | groups[..., 3] >> 2) & 1023
+    words[..., 3] = (groups[..., 3] << 8 | groups[..., 4] >> 0) & 1023
+    words = words.reshape(num_channels, -1)[:, :num_quads]
+
+    return _ten_bit_unsigned_to_signed_int(words.astype(np.int16)).astype(np.float32)
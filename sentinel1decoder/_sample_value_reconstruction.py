@@ -10,78 +10,100 @@ import numpy as np
 
 from . import _lookup_tables as lookup
 
+# Per-BRC simple reconstruction parameters, indexed by BRC.
+_SIMPLE_THIDX_LIMIT = lookup.simple_thidx_limit
+_MAX_MCODE = lookup.simple_max_mcode
 
-def reconstruct_channel_vals(data, block_brcs, block_thidxs, vals_to_process):
+
+def _stack_tables(tables, width):
+    """Stack per-BRC lookup tables into a single zero-padded 2D array."""
+    stacked = np.zeros((len(tables), width))
+    for brc, table in enumerate(tables):
+        stacked[brc, :len(table)] = table
+    return stacked
+
+
+# Simple reconstruction values indexed by [brc, thidx], and normalized
+# reconstruction levels indexed by [brc, mcode].
+_B = _stack_tables((lookup.b0, lookup.b1, lookup.b2, lookup.b3, lookup.b4), 9)
+_NRL = _stack_tables((lookup.nrl_b0, lookup.nrl_b1, lookup.nrl_b2, lookup.nrl_b3, lookup.nrl_b4), 16)
+_SF = lookup.sf
+
+
+def _build_magnitude_table():
+    """
+    Tabulate the reconstructed magnitude of every BRC, THIDX and mcode.
+
+    BRC is a 3-bit field of which only values 0-4 are defined, and each BRC
+    only uses a subset of the 4-bit magnitude codes. Combinations which can't
+    be reconstructed are set to NaN.
+
+    Returns:
+        A float32 array of magnitudes indexed by [brc, thidx, mcode].
+    """
+    table = np.full((8, 256, 16), np.nan, dtype=np.float32)
+    for brc, (thidx_limit, max_mcode) in enumerate(zip(_SIMPLE_THIDX_LIMIT, _MAX_MCODE)):
+        simple = slice(0, thidx_limit + 1)
+        normalized = slice(thidx_limit + 1, None)
+
+        table[brc, simple, :max_mcode] = np.arange(max_mcode)
+        table[brc, simple, max_mcode] = _B[brc, simple]
+        table[brc, normalized, :max_mcode + 1] = np.outer(_SF[normalized], _NRL[brc, :max_mcode + 1])
+    return table
+
+
+# Flattened so each sample is a single gather from a contiguous 1D table
+_MAGNITUDES = _build_magnitude_table()
+_THIDX_STRIDE = _MAGNITUDES.shape[2]
+_BRC_STRIDE = _MAGNITUDES.shape[1] * _THIDX_STRIDE
+_MAGNITUDES = _MAGNITUDES.ravel()
+
+
+def reconstruct_channel_vals(signs, mcodes, block_brcs, block_thidxs, vals_to_process):
+    """
+    Reconstruct sample values from FDBAQ sign bits and magnitude codes.
+
+    The sign bits and magnitude codes may be a single channel, or a 2D array
+    with one row per channel. All channels in a packet share the same BRC
+    and THIDX blocks, so the table offsets are only computed once.
+
+    Args:
+        signs:          Sign bits, indexed by [..., sample]
+        mcodes:         Magnitude codes, indexed by [..., sample]
+        block_brcs:     The Bit Rate Code of each block of 128 samples
+        block_thidxs:   The Threshold Index of each block of 128 samples
+        vals_to_process: Number of samples in each channel
+
+    Returns:
+        A float32 array of reconstructed values indexed by [..., sample]
+    """
     if not len(block_brcs) == len(block_thidxs):
         logging.error("Mismatched lengths of BRC block parameters")
     num_brc_blocks = len(block_brcs)
 
-    out_vals = np.zeros(vals_to_process)
-    n = 0
-    # For each BRC block
-    for block_index in range(num_brc_blocks):
-
-        brc = int(block_brcs[block_index])
-        thidx = int(block_thidxs[block_index])
-
-        # For each code in the BRC block
-        for i in range(min(128, vals_to_process - n)):
-
-            s_code = data[n]
-
-            if brc == 0:
-                if thidx <= 3:
-                    if s_code.get_mcode < 3:
-                        out_vals[n] = (-1)**s_code.get_sign * s_code.get_mcode
-                    elif s_code.get_mcode == 3:
-                        out_vals[n] = (-1)**s_code.get_sign * lookup.b0[thidx]
-                    else:
-                        logging.error("Unhandled reconstruction case")
-                else:
-                    out_vals[n] = (-1)**s_code.get_sign * lookup.nrl_b0[s_code.get_mcode] * lookup.sf[thidx]
-            elif brc == 1:
-                if thidx <= 3:
-                    if s_code.get_mcode < 4:
-                        out_vals[n] = (-1)**s_code.get_sign * s_code.get_mcode
-                    elif s_code.get_mcode == 4:
-                        out_vals[n] = (-1)**s_code.get_sign * lookup.b1[thidx]
-                    else:
-                        logging.error("Unhandled reconstruction case")
-                else:
-                    out_vals[n] = (-1)**s_code.get_sign * lookup.nrl_b1[s_code.get_mcode] * lookup.sf[thidx]
-            elif brc == 2:
-                if thidx <= 5:
-                    if s_code.get_mcode < 6:
-                        out_vals[n] = (-1)**s_code.get_sign * s_code.get_mcode
-                    elif s_code.get_mcode == 6:
-                        out_vals[n] = (-1)**s_code.get_sign * lookup.b2[thidx]
-                    else:
-                        logging.error("Unhandled reconstruction case")
-                else:
-                    out_vals[n] = (-1)**s_code.get_sign * lookup.nrl_b2[s_code.get_mcode] * lookup.sf[thidx]
-            elif brc == 3:
-                if thidx <= 6:
-                    if s_code.get_mcode < 9:
-                        out_vals[n] = (-1)**s_code.get_sign * s_code.get_mcode
-                    elif s_code.get_mcode == 9:
-                        out_vals[n] = (-1)**s_code.get_sign * lookup.b3[thidx]
-                    else:
-                        logging.error("Unhandled reconstruction case")
-                else:
-                    out_vals[n] = (-1)**s_code.get_sign * lookup.nrl_b3[s_code.get_mcode] * lookup.sf[thidx]
-            elif brc == 4:
-                if thidx <= 8:
-                    if s_code.get_mcode < 15:
-                        out_vals[n] = (-1)**s_code.get_sign * s_code.get_mcode
-                    elif s_code.get_mcode == 15:
-                        out_vals[n] = (-1)**s_code.get_sign * lookup.b4[thidx]
-                    else:
-                        logging.error("Unhandled reconstruction case")
-                else:
-                    out_vals[n] = (-1)**s_code.get_sign * lookup.nrl_b4[s_code.get_mcode] * lookup.sf[thidx]
-            else:
-                logging.error("Unhandled reconstruction case")
-
-            n += 1
+    signs = np.asarray(signs)
+    mcodes = np.asarray(mcodes)
+    out_vals = np.zeros(signs.shape[:-1] + (vals_to_process,), dtype=np.float32)
+
+    # Each BRC block holds up to 128 codes, so expand the per-block
+    # table offsets out to one value per code.
+    n = min(vals_to_process, 128 * num_brc_blocks)
+    block_offsets = (
+        np.asarray(block_brcs, dtype=np.intp) * _BRC_STRIDE
+        + np.asarray(block_thidxs, dtype=np.intp) * _THIDX_STRIDE
+    )
+    offsets = np.repeat(block_offsets, 128)[:n]
+
+    signs = signs[..., :n].astype(np.int8)
+    mcodes = mcodes[..., :n].astype(np.intp)
+
+    magnitudes = _MAGNITUDES.take(offsets + mcodes)
+    unhandled = np.isnan(magnitudes)
+    if unhandled.any():
+        logging.error("Unhandled reconstruction case")
+        magnitudes[unhandled] = 0
+
+    # Sign bit of 1 is negative: map {0, 1} to {+1, -1} without a power op
+    out_vals[..., :n] = (1 - 2 * signs) * magnitudes
 
     return out_vals
@@ -1,9 +1,17 @@
 import logging
 
+import numpy as np
+
 from . import _sample_value_reconstruction as rec
 from ._fdbaq_decoder import FDBAQDecoder
 from ._sample_code_bypass import decode_bypass_data
 
+# Data format types by BAQ mode, as given in the packet secondary header
+_BYPASS_MODES = frozenset({0})
+_BAQ_MODES = frozenset({3, 4, 5})
+_FDBAQ_MODES = frozenset({12, 13, 14})
+_VALID_BAQ_MODES = _BYPASS_MODES | _BAQ_MODES | _FDBAQ_MODES
+
 
 class user_data_decoder:
     """Decoder for the user data portion of Sentinel-1 space packets."""
@@ -12,8 +20,10 @@ class user_data_decoder:
     # SCode extraction and reconstruction classes. It decodes and reconstructs
     # the IE, IO, QE, QO values from a single space packet.
 
+    __slots__ = ('data', 'baq_mode', 'num_quads')
+
     def __init__(self, data, baq_mode, num_quads):
-        if baq_mode not in (0, 3, 4, 5, 12, 13, 14):
+        if baq_mode not in _VALID_BAQ_MODES:
             logging.error(f"Unrecognized BAQ mode: {baq_mode}")
             raise Exception(f"Unrecognized BAQ mode: {baq_mode}")
 
@@ -21,7 +31,7 @@ class user_data_decoder:
         self.baq_mode = baq_mode
         self.num_quads = num_quads
 
-    def decode(self):
+    def decode(self, out=None):
         """Decode the user data according to the specified encoding mode.
 
         Refer to SAR Space Protocol Data Unit specification document pg.56.
@@ -34,68 +44,70 @@ class user_data_decoder:
               to type C, but the samples are also Huffman encoded. This format
               is the one typically used for radar echo data.
 
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            A complex64 array of 2 * num_quads values to write the decoded
+            samples into, e.g. a row of a caller's output array. A new array
+            is allocated if this isn't given.
+
         Returns
         -------
-        IE : TYPE
-            DESCRIPTION.
-        IO : TYPE
-            DESCRIPTION.
-        QE : TYPE
-            DESCRIPTION.
-        QO : TYPE
-            DESCRIPTION.
+        numpy.ndarray
+            The 2 * num_quads complex64 samples of the packet in time order,
+            with the even and odd channels interleaved: IE + 1j*QE for even
+            samples and IO + 1j*QO for odd samples. This is out if it was
+            supplied.
 
         """
-        # TODO: Finish docstrings
-
         # The decoding method used depends on the BAQ mode used.
         # The BAQ mode used for this packet is specified in the packet header.
-        if self.baq_mode == 0:
-            # Bypass data is encoded as a simple list of 10-bit words.
-            # No value reconstruction is required in this mode.
-
-            IE, IO, QE, QO = decode_bypass_data(self.data, self.num_quads)
-
-        elif self.baq_mode in (3, 4, 5):
-            # TODO - Implement Data format type C decoding.
-            logging.error("Attempted to decode data format C")
-            raise NotImplementedError("Data format C is not implemented yet!")
-
-        elif self.baq_mode in (12, 13, 14):
-            # FDBAQ data uses various types of Huffman encoding.
-
-            # Sample code extraction happens in FDBAQDedcoder __init__ function
-            # The extracted channel SCodes are properties of FDBAQDedcoder
-            scode_extractor = FDBAQDecoder(self.data, self.num_quads)
-            brcs = scode_extractor.get_brcs
-            thidxs = scode_extractor.get_thidxs
-
-            logging.debug(f"Read BRCs: {brcs}")
-            logging.debug(f"Read THIDXs: {thidxs}")
-
-            # Huffman-decoded sample codes are grouped into blocks, and can be
-            # reconstructed using various lookup tables which cross-reference
-            # that Block's Bit-Rate Code (BRC) and Threshold Index (THIDX)
-            IE = rec.reconstruct_channel_vals(
-                scode_extractor.get_s_ie, brcs, thidxs, self.num_quads
-            )
-            IO = rec.reconstruct_channel_vals(
-                scode_extractor.get_s_io, brcs, thidxs, self.num_quads
-            )
-            QE = rec.reconstruct_channel_vals(
-                scode_extractor.get_s_qe, brcs, thidxs, self.num_quads
-            )
-            QO = rec.reconstruct_channel_vals(
-                scode_extractor.get_s_qo, brcs, thidxs, self.num_quads
-            )
-
-        else:
-            logging.error(f"Attempted to decode using invalid BAQ mode: {self.baq_mode}")
+        IE, IO, QE, QO = self._DECODERS[self.baq_mode](self)
 
         # Re-order the even-indexed and odd-indexed sample channels here.
-        decoded_data = []
-        for i in range(len(IE)):
-            decoded_data.append(complex(IE[i], QE[i]))
-            decoded_data.append(complex(IO[i], QO[i]))
+        if out is None:
+            decoded_data = np.empty(2 * len(IE), dtype=np.complex64)
+        else:
+            decoded_data = out
+        decoded_data[0::2].real = IE
+        decoded_data[0::2].imag = QE
+        decoded_data[1::2].real = IO
+        decoded_data[1::2].imag = QO
 
         return decoded_data
+
+    def _decode_bypass(self):
+        # Bypass data is encoded as a simple list of 10-bit words.
+        # No value reconstruction is required in this mode.
+        return decode_bypass_data(self.data, self.num_quads)
+
+    def _decode_baq(self):
+        # TODO - Implement Data format type C decoding.
+        logging.error("Attempted to decode data format C")
+        raise NotImplementedError("Data format C is not implemented yet!")
+
+    def _decode_fdbaq(self):
+        # FDBAQ data uses various types of Huffman encoding.
+
+        # Sample code extraction happens in FDBAQDedcoder __init__ function
+        # The extracted channel SCodes are properties of FDBAQDedcoder
+        scode_extractor = FDBAQDecoder(self.data, self.num_quads)
+        brcs = scode_extractor.get_brcs
+        thidxs = scode_extractor.get_thidxs
+
+        logging.debug("Read BRCs: %s", brcs)
+        logging.debug("Read THIDXs: %s", thidxs)
+
+        # Huffman-decoded sample codes are grouped into blocks, and can be
+        # reconstructed using various lookup tables which cross-reference
+        # that Block's Bit-Rate Code (BRC) and Threshold Index (THIDX)
+        return rec.reconstruct_channel_vals(
+            *scode_extractor.get_sample_codes, brcs, thidxs, self.num_quads
+        )
+
+    # Decoding method for each BAQ mode
+    _DECODERS = {
+        **dict.fromkeys(_BYPASS_MODES, _decode_bypass),
+        **dict.fromkeys(_BAQ_MODES, _decode_baq),
+        **dict.fromkeys(_FDBAQ_MODES, _decode_fdbaq),
+    }
@@ -61,6 +61,9 @@ SWAP_FLAG_FIELD_NAME = 'Swap Flag'
 SWATH_NUM_FIELD_NAME = 'Swath Number'
 NUM_QUADS_FIELD_NAME = 'Number of Quads'
 
+# Location of each packet within the file
+PACKET_OFFSET_FIELD_NAME = 'Packet Byte Offset'
+
 # Subcommed data output dataframe field names
 X_POS_FIELD_NAME = "X-axis position ECEF"
 Y_POS_FIELD_NAME = "Y-axis position ECEF"
@@ -5,14 +5,78 @@ Created on Wed Jun 29 22:02:54 2022.
 @author: richa
 """
 import logging
+import mmap
+import os
 import numpy as np
 import pandas as pd
 
 from . import _headers as hdrs
+from ._jit import HAVE_NUMBA, njit
 from ._user_data_decoder import user_data_decoder
 from . import constants as cnst
 
-from typing import BinaryIO, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterator, Tuple
+
+# Fields of the combined primary and secondary packet headers, in decoded order
+_HEADER_FIELDS = hdrs.PRIMARY_HEADER_FIELDS + hdrs.SECONDARY_HEADER_FIELDS
+
+# Number of packets sent to a worker process at a time, and the number of
+# these chunks queued per worker when decoding across a process pool
+_POOL_CHUNKSIZE = 64
+_POOL_CHUNKS_IN_FLIGHT = 4
+
+# Column types for the decoded packet metadata. Integer fields use the
+# smallest signed type that holds their full unsigned range, so that
+# arithmetic on them (e.g. differences between packets) can't wrap around.
+_METADATA_DTYPES = {
+    cnst.PACKET_VER_NUM_FIELD_NAME: np.int8,
+    cnst.PACKET_TYPE_FIELD_NAME: np.int8,
+    cnst.SECONDARY_HEADER_FIELD_NAME: np.int8,
+    cnst.PID_FIELD_NAME: np.int8,
+    cnst.PCAT_FIELD_NAME: np.int8,
+    cnst.SEQUENCE_FLAGS_FIELD_NAME: np.int8,
+    cnst.PACKET_SEQUENCE_COUNT_FIELD_NAME: np.int16,
+    cnst.PACKET_DATA_LEN_FIELD_NAME: np.int32,
+    cnst.COARSE_TIME_FIELD_NAME: np.int64,
+    cnst.FINE_TIME_FIELD_NAME: np.float64,
+    cnst.SYNC_FIELD_NAME: np.int64,
+    cnst.DATA_TAKE_ID_FIELD_NAME: np.int64,
+    cnst.ECC_NUM_FIELD_NAME: np.int16,
+    cnst.TEST_MODE_FIELD_NAME: np.int8,
+    cnst.RX_CHAN_ID_FIELD_NAME: np.int8,
+    cnst.INSTRUMENT_CONFIG_ID_FIELD_NAME: np.int64,
+    cnst.SUBCOM_ANC_DATA_WORD_INDEX_FIELD_NAME: np.int16,
+    cnst.SUBCOM_ANC_DATA_WORD_FIELD_NAME: np.int32,
+    cnst.SPACE_PACKET_COUNT_FIELD_NAME: np.int64,
+    cnst.PRI_COUNT_FIELD_NAME: np.int64,
+    cnst.ERROR_FLAG_FIELD_NAME: np.int8,
+    cnst.BAQ_MODE_FIELD_NAME: np.int8,
+    cnst.BAQ_BLOCK_LEN_FIELD_NAME: np.int16,
+    cnst.RANGE_DEC_FIELD_NAME: np.int16,
+    cnst.RX_GAIN_FIELD_NAME: np.float64,
+    cnst.TX_RAMP_RATE_FIELD_NAME: np.float64,
+    cnst.TX_PULSE_START_FREQ_FIELD_NAME: np.float64,
+    cnst.TX_PULSE_LEN_FIELD_NAME: np.float64,
+    cnst.RANK_FIELD_NAME: np.int8,
+    cnst.PRI_FIELD_NAME: np.float64,
+    cnst.SWST_FIELD_NAME: np.float64,
+    cnst.SWL_FIELD_NAME: np.float64,
+    cnst.SAS_SSB_FLAG_FIELD_NAME: np.int8,
+    cnst.POLARIZATION_FIELD_NAME: np.int8,
+    cnst.TEMP_COMP_FIELD_NAME: np.int8,
+    cnst.CAL_MODE_FIELD_NAME: np.int8,
+    cnst.TX_PULSE_NUM_FIELD_NAME: np.int8,
+    cnst.SIGNAL_TYPE_FIELD_NAME: np.int8,
+    cnst.SWAP_FLAG_FIELD_NAME: np.int8,
+    cnst.SWATH_NUM_FIELD_NAME: np.int16,
+    cnst.NUM_QUADS_FIELD_NAME: np.int32,
+    cnst.PACKET_OFFSET_FIELD_NAME: np.int64,
+}
 
 class Level0Decoder:
     """Decoder for Sentinel-1 Level 0 files."""
@@ -34,22 +98,20 @@ class Level0Decoder:
         Returns:
             A Pandas Dataframe containing the decoded metadata.
         """
-        output_row_list = []
-
-        with open(self.filename, 'rb') as f:
+        with _map_file(self.filename) as file_data:
             # An input file typically consists of many packets.
             # We don't know how many ahead of time.
-            while True:
-                try:
-                    output_dictionary_row, _ = self._read_single_packet(f)
-                except NoMorePacketsException as e:
-                    break
-                output_row_list.append(output_dictionary_row)
+            offsets = _find_packet_offsets(file_data)
+            header_bytes = _gather_header_bytes(file_data, offsets)
+
+        output_columns = hdrs.decode_headers(header_bytes)
+        # Record where each packet is so its data can be read directly later
+        output_columns[cnst.PACKET_OFFSET_FIELD_NAME] = offsets
 
-        output_dataframe = pd.DataFrame(output_row_list)
-        return output_dataframe
+        output_dataframe = pd.DataFrame(output_columns)
+        return output_dataframe.astype(_METADATA_DTYPES)
 
-    def decode_packets(self, input_header: pd.DataFrame) -> np.array:
+    def decode_packets(self, input_header: pd.DataFrame, num_workers: int = 1) -> np.array:
         """Decode the user data payload from the specified space packets.
 
         Packet data typically consists of a single radar echo. SAR images are
@@ -60,10 +122,13 @@ class Level0Decoder:
                             is to call decode_metadata to return the full set of packets in the
                             file, select the desired packets from these, and supply the result
                             as the input to this function.
+            num_workers:    Number of processes to decode packets with. Packets are decoded
+                            in parallel across a process pool if this is greater than 1.
 
         Returns:
             The complex I/Q values outputted by the Sentinel-1 SAR instrument
-            and downlinked in the specified space packets.
+            and downlinked in the specified space packets, with one row per
+            packet in the same order as input_header.
 
         """
         # Check we can output this data as a single block.
@@ -79,76 +144,310 @@ class Level0Decoder:
             logging.error(f"Supplied mismatched header info - too many number of quads {num_quads}")
             raise Exception(f"Received {len(num_quads)} different number of quads {num_quads}, expected 1.")
 
-        packet_counter = 0
         packets_to_process = len(input_header)
         nq = input_header[cnst.NUM_QUADS_FIELD_NAME].unique()[0]
 
-        output_data = np.zeros([packets_to_process, nq * 2], dtype=(complex))
+        output_data = np.zeros([packets_to_process, nq * 2], dtype=np.complex64)
+
+        pool = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else nullcontext()
+        with _map_file(self.filename) as file_data, pool:
+            if cnst.PACKET_OFFSET_FIELD_NAME in input_header:
+                packets = self._index_packets(file_data, input_header)
+            else:
+                # Without packet offsets we have to search the file for the packets
+                packets = self._scan_packets(file_data, input_header)
+
+            # Packets are independent of each other, so can be decoded across
+            # a process pool. Otherwise decode each packet straight into its
+            # output row.
+            if num_workers > 1:
+                packet_decoders = _decode_in_pool(pool, packets, num_workers)
+            else:
+                packet_decoders = (
+                    (row, this_header, partial(_decode_user_data, packet_data_bytes, this_header))
+                    for row, this_header, packet_data_bytes in packets
+                )
 
-        with open(self.filename, 'rb') as f:
             # Each iteration of the below loop will process one space packet.
-            # An input file typically consists of many packets.
-            while packet_counter < packets_to_process:
+            for row, this_header, decode_packet in packet_decoders:
+                logging.debug("Decoding data from packet: %s", this_header)
                 try:
-                    this_header, packet_data_bytes = self._read_single_packet(f)
-                except NoMorePacketsException as e:
-                    break
-
-                # Comparing space packet count is faster than comparing entire row
-                if this_header[cnst.SPACE_PACKET_COUNT_FIELD_NAME] in input_header[cnst.SPACE_PACKET_COUNT_FIELD_NAME].values:
-                    logging.debug(f"Decoding data from packet: {this_header}")
-                    try:
-                        baqmod = this_header[cnst.BAQ_MODE_FIELD_NAME]
-                        nq = this_header[cnst.NUM_QUADS_FIELD_NAME]
-                        data_decoder = user_data_decoder(packet_data_bytes, baqmod, nq)
-                        this_data_packet = data_decoder.decode()
-                        output_data[packet_counter, :] = this_data_packet
-                    except Exception as e:
-                        logging.error(f"Failed to process packet {packet_counter} with Space Packet Count {this_header[cnst.SPACE_PACKET_COUNT_FIELD_NAME]}\n{e}")
-                        output_data[packet_counter, :] = 0
-                                      
-
-                    logging.debug("Finished decoding packet data")
-
-                    packet_counter += 1
+                    decode_packet(output_data[row])
+                except Exception as e:
+                    logging.error(f"Failed to process packet {row} with Space Packet Count {this_header[cnst.SPACE_PACKET_COUNT_FIELD_NAME]}\n{e}")
+                    output_data[row, :] = 0
+
+                logging.debug("Finished decoding packet data")
 
         return output_data
 
-    def _read_single_packet(self, opened_file: BinaryIO) -> Tuple[dict, bytes]:
+    def _index_packets(self, file_data: bytes, input_header: pd.DataFrame) -> Iterator[Tuple[int, dict, bytes]]:
+        """
+        Read the specified packets directly from their recorded byte offsets.
+
+        Args:
+            file_data:      Contents of a Sentinel-1 RAW file, typically memory-mapped
+            input_header:   A DataFrame of the packets to read, including packet offsets
+
+        Returns:
+            The position of each packet in input_header
+            A dict of the header data fields needed to decode each packet
+            The raw bytes of the user data payload for each packet
+        """
+        header_fields = [
+            cnst.PACKET_OFFSET_FIELD_NAME,
+            cnst.PACKET_DATA_LEN_FIELD_NAME,
+            cnst.SPACE_PACKET_COUNT_FIELD_NAME,
+            cnst.BAQ_MODE_FIELD_NAME,
+            cnst.NUM_QUADS_FIELD_NAME,
+        ]
+        for row, this_header in enumerate(input_header[header_fields].to_dict('records')):
+            # User data follows the 6 byte primary header and 62 byte secondary header
+            offset = this_header[cnst.PACKET_OFFSET_FIELD_NAME]
+            data_field_end = offset + 6 + this_header[cnst.PACKET_DATA_LEN_FIELD_NAME]
+            yield row, this_header, file_data[offset+68:data_field_end]
+
+    def _scan_packets(self, file_data: bytes, input_header: pd.DataFrame) -> Iterator[Tuple[int, dict, bytes]]:
+        """
+        Search the file in order for the specified packets.
+
+        Packets are found in file order, which needn't match their order in
+        input_header, so each is returned with its position in input_header.
+
+        Args:
+            file_data:      Contents of a Sentinel-1 RAW file, typically memory-mapped
+            input_header:   A DataFrame of the packets to read
+
+        Returns:
+            The position of each packet in input_header
+            A dict of the header data fields for each packet
+            The raw bytes of the user data payload for each packet
+        """
+        # Comparing space packet count is faster than comparing entire row
+        wanted_packet_counts = {
+            space_packet_count: row
+            for row, space_packet_count in enumerate(input_header[cnst.SPACE_PACKET_COUNT_FIELD_NAME].tolist())
+        }
+
+        packets_found = 0
+        for offset in _find_packet_offsets(file_data):
+            if packets_found == len(input_header):
+                break
+
+            # Only fully decode the headers of the packets we want. The space
+            # packet count is bytes 23-26 of the secondary header.
+            space_packet_count = int.from_bytes(file_data[offset+29:offset+33], 'big')
+            if space_packet_count in wanted_packet_counts:
+                header_values, packet_data_bytes, _ = self._read_single_packet(file_data, offset)
+                packets_found += 1
+                yield wanted_packet_counts[space_packet_count], dict(zip(_HEADER_FIELDS, header_values)), packet_data_bytes
+
+    def _read_single_packet(self, file_data: bytes, offset: int) -> Tuple[tuple, bytes, int]:
         """
         Read a single packet of data from the file.
 
         Args:
-            opened_file:    Sentinel-1 RAW file opened in 'rb' mode with read
-                            position at the start of a packet
+            file_data:  Contents of a Sentinel-1 RAW file, typically memory-mapped
+            offset:     Byte offset of the start of a packet within file_data
 
         Returns:
-            A dict of the header data fields for this packet
+            A tuple of the header data fields for this packet, in the order of _HEADER_FIELDS
             The raw bytes of the user data payload for this packet
+            The byte offset of the start of the next packet
         """
         # PACKET PRIMARY HEADER (6 bytes)
         # First check if we have reached the end of the file
-        data_buffer = opened_file.read(6)
-        if not data_buffer:
+        if offset >= len(file_data):
             raise NoMorePacketsException()
 
-        output_dictionary_row = hdrs.decode_primary_header(data_buffer)
+        primary_hdr = hdrs.decode_primary_header_values(file_data[offset:offset+6])
 
         # PACKET DATA FIELD (between 62 and 65534 bytes)
         # First 62 bytes contain the PACKET SECONDARY HEADER
-        pkt_data_len = output_dictionary_row[cnst.PACKET_DATA_LEN_FIELD_NAME]
-        packet_data_buffer = opened_file.read(pkt_data_len)
-        if not packet_data_buffer:
+        pkt_data_len = primary_hdr[-1]  # Packet data length is the last primary header field
+        data_field_start = offset + 6
+        next_offset = data_field_start + pkt_data_len
+        if data_field_start >= len(file_data):
             raise Exception(f"Unexpectedly hit EOF while trying to read packet data field.")
 
-        secondary_hdr = hdrs.decode_secondary_header(packet_data_buffer[:62])
-        output_dictionary_row.update(secondary_hdr)
+        # Slice the secondary header and user data straight from the file
+        # rather than copying the whole data field first.
+        secondary_hdr = hdrs.decode_secondary_header_values(file_data[data_field_start:data_field_start+62])
 
         # END OF SECONDARY HEADER.
         # User data follows for bytes 62 ---> packet_data_length
-        output_bytes = packet_data_buffer[62:]
-
-        return output_dictionary_row, output_bytes
+        output_bytes = file_data[data_field_start+62:next_offset]
+
+        return primary_hdr + secondary_hdr, output_bytes, next_offset
+
+
+def _decode_user_data(packet_data_bytes: bytes, header: dict, out: np.ndarray = None) -> np.ndarray:
+    """
+    Decode the user data payload of a single packet.
+
+    Args:
+        packet_data_bytes:  The raw bytes of the user data payload
+        header:             A dict of the header data fields for this packet
+        out:                Optional complex64 array to write the decoded values into
+
+    Returns:
+        The complex I/Q values from this packet
+    """
+    baqmod = header[cnst.BAQ_MODE_FIELD_NAME]
+    nq = header[cnst.NUM_QUADS_FIELD_NAME]
+    data_decoder = user_data_decoder(packet_data_bytes, baqmod, nq)
+    return data_decoder.decode(out)
+
+
+def _decode_user_data_chunk(payloads: Tuple[bytes, ...], headers: Tuple[dict, ...]) -> list:
+    """
+    Decode a chunk of packets in a worker process.
+
+    Errors are returned in place of the decoded values rather than raised, so
+    that one bad packet doesn't lose the results of the rest of its chunk.
+
+    Args:
+        payloads:   The raw bytes of the user data payload of each packet
+        headers:    A dict of the header data fields for each packet
+
+    Returns:
+        The complex I/Q values of each packet, or the exception raised decoding it
+    """
+    results = []
+    for packet_data_bytes, header in zip(payloads, headers):
+        try:
+            results.append(_decode_user_data(packet_data_bytes, header))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _copy_result(result, out: np.ndarray) -> None:
+    """Copy the decoded values of a packet from a worker process into its output row."""
+    if isinstance(result, Exception):
+        raise result
+    out[:] = result
+
+
+def _decode_in_pool(pool: ProcessPoolExecutor, packets: Iterator[Tuple[int, dict, bytes]],
+                    num_workers: int) -> Iterator[Tuple[int, dict, Callable]]:
+    """
+    Decode packets across a process pool.
+
+    Packets are sent to the workers in chunks to reduce the inter-process
+    overhead per packet. Only a few chunks per worker are in flight at once,
+    so that a large selection of packets isn't all held in memory, and a new
+    chunk is submitted as soon as the oldest is collected so the workers
+    don't sit idle.
+
+    Args:
+        pool:           The process pool to decode with
+        packets:        The position, header fields and user data of each packet
+        num_workers:    Number of processes in the pool
+
+    Returns:
+        The position of each packet
+        A dict of the header data fields for each packet
+        A function which copies the packet's decoded values into an output row
+    """
+    packets = iter(packets)
+    in_flight = deque()
+
+    def submit_chunks():
+        while len(in_flight) < _POOL_CHUNKS_IN_FLIGHT * num_workers:
+            chunk = list(islice(packets, _POOL_CHUNKSIZE))
+            if not chunk:
+                return
+            rows, headers, payloads = zip(*chunk)
+            in_flight.append((rows, headers, pool.submit(_decode_user_data_chunk, payloads, headers)))
+
+    submit_chunks()
+    while in_flight:
+        # Collect chunks in the order they were submitted, topping up the
+        # pool before waiting on the oldest
+        rows, headers, future = in_flight.popleft()
+        submit_chunks()
+        for row, this_header, result in zip(rows, headers, future.result()):
+            yield row, this_header, partial(_copy_result, result)
+
+
+def _find_packet_offsets(file_data: bytes) -> np.ndarray:
+    """
+    Find the start of each packet in a file without decoding the headers.
+
+    Packets are variable length, so each packet's position depends on the
+    lengths of all preceding packets. Only the packet data length from each
+    primary header is read to step from one packet to the next.
+
+    Args:
+        file_data: Contents of a Sentinel-1 RAW file, typically memory-mapped
+
+    Returns:
+        An array of the byte offset of the start of each packet
+    """
+    if HAVE_NUMBA:
+        file_data = np.frombuffer(file_data, dtype=np.uint8)
+    return _walk_packet_lengths(file_data)
+
+
+@njit(cache=True)
+def _walk_packet_lengths(file_data):
+    """Step through the packet data lengths of each primary header in turn."""
+    offsets = np.empty(1024, dtype=np.int64)
+    num_packets = 0
+    offset = 0
+    while offset < len(file_data):
+        if num_packets == len(offsets):
+            offsets = np.concatenate((offsets, np.empty_like(offsets)))
+        offsets[num_packets] = offset
+        num_packets += 1
+
+        # A truncated primary header has no length to step past
+        if offset + 6 > len(file_data):
+            break
+        # Packet data length is bytes 4-5 of the primary header, stored minus one
+        offset += 7 + ((file_data[offset + 4] << 8) | file_data[offset + 5])
+    return offsets[:num_packets]
+
+
+def _gather_header_bytes(file_data: bytes, offsets: np.ndarray) -> np.ndarray:
+    """
+    Copy the primary and secondary header of each packet into an array.
+
+    Args:
+        file_data:  Contents of a Sentinel-1 RAW file, typically memory-mapped
+        offsets:    The byte offset of the start of each packet, in ascending order
+
+    Returns:
+        A uint8 array with one row of 68 header bytes per packet
+    """
+    if not len(offsets):
+        return np.empty((0, 68), dtype=np.uint8)
+    if offsets[-1] + 68 > len(file_data):
+        raise Exception(f"Unexpectedly hit EOF while trying to read the headers of the packet at byte {offsets[-1]}.")
+    data = np.frombuffer(file_data, dtype=np.uint8)
+    # Each row is a copy of a 68 byte window starting at that packet's offset
+    return np.lib.stride_tricks.sliding_window_view(data, 68)[offsets]
+
+
+@contextmanager
+def _map_file(filename: str) -> Iterator[bytes]:
+    """
+    Memory-map a file for reading, so packets can be sliced out of it directly.
+
+    Args:
+        filename: The file to map
+
+    Returns:
+        The read-only mapped file contents. Empty files cannot be mapped, so
+        an empty bytes object is returned for these instead.
+    """
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
 
 
 class NoMorePacketsException(Exception):
@@ -0,0 +1,24 @@
+from sentinel1decoder._fdbaq_decoder import FDBAQDecoder
+
+import pytest
+
+# Two quads with BRC 0 and THIDX 5. Each channel is padded to a 16-bit word.
+#   IE: BRC 000, codes (+, 0) (-, 10)
+#   IO: codes (+, 111) (-, 110)
+#   QE: THIDX 00000101, codes (+, 0) (+, 10)
+#   QO: codes (-, 0) (+, 0)
+TEST_DATA = bytes([0x06, 0x00, 0x7E, 0x00, 0x05, 0x10, 0x80, 0x00])
+
+def test_fdbaq_decoder():
+    decoder = FDBAQDecoder(TEST_DATA, 2)
+
+    assert list(decoder.get_brcs) == [0]
+    assert list(decoder.get_thidxs) == [5]
+    assert [list(x) for x in decoder.get_s_ie] == [[0, 1], [0, 1]]
+    assert [list(x) for x in decoder.get_s_io] == [[0, 1], [3, 2]]
+    assert [list(x) for x in decoder.get_s_qe] == [[0, 0], [0, 1]]
+    assert [list(x) for x in decoder.get_s_qo] == [[1, 0], [0, 0]]
+
+def test_fdbaq_decoder_truncated():
+    with pytest.raises(IndexError):
+        FDBAQDecoder(TEST_DATA[:5], 2)
@@ -1,5 +1,8 @@
-from sentinel1decoder._headers import decode_primary_header
+from sentinel1decoder._headers import (
+    decode_primary_header, decode_primary_header_values, decode_secondary_header_values, decode_headers
+)
 
+import numpy as np
 import pytest
 
 def test_decode_primary_header():
@@ -9,5 +12,27 @@ def test_decode_primary_header():
     # Supply too many bytes
     with pytest.raises(Exception):
         decode_primary_header(0xFFFFFFFFFFFFFF)
+    with pytest.raises(ValueError):
+        decode_primary_header(bytes(5))
+    with pytest.raises(ValueError):
+        decode_primary_header(bytes(7))
 
-    # TODO: More tests here - get some mock data
\ No newline at end of file
+    # TODO: More tests here - get some mock data
+
+def test_decode_headers():
+    # Batch decoding matches decoding each packet's headers individually
+    rng = np.random.default_rng(0)
+    header_bytes = rng.integers(0, 256, size=(50, 68), dtype=np.uint8)
+    header_bytes[:, 12:16] = [0x35, 0x2E, 0xF8, 0x53]
+
+    decoded = decode_headers(header_bytes)
+
+    for row, packet_bytes in enumerate(header_bytes):
+        expected = (
+            decode_primary_header_values(packet_bytes[:6].tobytes())
+            + decode_secondary_header_values(packet_bytes[6:].tobytes())
+        )
+        assert tuple(column[row] for column in decoded.values()) == expected
+
+    with pytest.raises(Exception):
+        decode_headers(header_bytes[:, :62])
@@ -0,0 +1,124 @@
+from sentinel1decoder.l0decoder import Level0Decoder, _METADATA_DTYPES, _find_packet_offsets, _map_file
+
+import sentinel1decoder.constants as cnst
+import sentinel1decoder.l0decoder as l0decoder
+
+import math
+import struct
+
+import numpy as np
+import pytest
+
+def make_packet(space_packet_count, num_quads=4, seed=0, baq_mode=0):
+    # A packet of random bypass samples with otherwise empty headers
+    rng = np.random.default_rng(seed)
+    secondary = bytearray(62)
+    secondary[6:10] = bytes([0x35, 0x2E, 0xF8, 0x53])  # Sync marker
+    secondary[23:27] = space_packet_count.to_bytes(4, 'big')
+    secondary[31] = baq_mode
+    secondary[58] = 10  # Swath number
+    secondary[59:61] = num_quads.to_bytes(2, 'big')
+    user_data = rng.integers(0, 256, 8 * math.ceil(10 * num_quads / 16), dtype=np.uint8).tobytes()
+
+    data_field = bytes(secondary) + user_data
+    data_field += bytes(-(6 + len(data_field)) % 4)
+    primary = struct.pack('>HHH', 0x0c1c, 0xc000 | (space_packet_count & 0x3fff), len(data_field) - 1)
+    return primary + data_field
+
+def test_find_packet_offsets():
+    packets = [make_packet(i, num_quads) for i, num_quads in enumerate((4, 21, 9))]
+    data = b''.join(packets)
+
+    offsets = _find_packet_offsets(data)
+    assert list(offsets) == [0, len(packets[0]), len(packets[0]) + len(packets[1])]
+
+def test_find_packet_offsets_truncated():
+    packets = [make_packet(0), make_packet(1)]
+    data = b''.join(packets)
+
+    # A truncated final header still marks the start of a packet, so that
+    # reading its headers can report the EOF
+    assert list(_find_packet_offsets(data + packets[0][:3])) == [0, len(packets[0]), len(data)]
+    # As does a packet whose data field is cut short
+    assert list(_find_packet_offsets(data[:-1])) == [0, len(packets[0])]
+
+def test_find_packet_offsets_empty():
+    assert len(_find_packet_offsets(b'')) == 0
+
+def test_map_file(tmp_path):
+    filename = tmp_path / 'packets.dat'
+    data = make_packet(0) + make_packet(1)
+    filename.write_bytes(data)
+    with _map_file(filename) as file_data:
+        assert file_data[:] == data
+
+    # Empty files can't be memory-mapped
+    filename.write_bytes(b'')
+    with _map_file(filename) as file_data:
+        assert len(file_data) == 0
+
+def test_decode_metadata_dtypes(tmp_path):
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(make_packet(0) + make_packet(0xffffffff))
+    metadata = Level0Decoder(str(filename)).decode_metadata()
+
+    assert list(metadata.columns) == list(_METADATA_DTYPES)
+    assert metadata.dtypes.to_dict() == {name: np.dtype(dtype) for name, dtype in _METADATA_DTYPES.items()}
+    # The largest values of unsigned fields don't wrap around
+    assert list(metadata[cnst.SPACE_PACKET_COUNT_FIELD_NAME]) == [0, 0xffffffff]
+    assert list(metadata[cnst.SYNC_FIELD_NAME]) == [0x352EF853] * 2
+
+def test_decode_metadata_truncated(tmp_path):
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(make_packet(0) + make_packet(1)[:40])
+    with pytest.raises(Exception):
+        Level0Decoder(str(filename)).decode_metadata()
+
+def test_decode_metadata_empty(tmp_path):
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(b'')
+    assert len(Level0Decoder(str(filename)).decode_metadata()) == 0
+
+def test_decode_packets_order(tmp_path):
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(b''.join(make_packet(i, seed=i) for i in range(6)))
+    decoder = Level0Decoder(str(filename))
+    metadata = decoder.decode_metadata()
+
+    # Rows follow the order of the selection, whether packets are read from
+    # their offsets or searched for in the file
+    selection = metadata.iloc[[4, 1, 3]]
+    indexed = decoder.decode_packets(selection)
+    scanned = decoder.decode_packets(selection.drop(columns=cnst.PACKET_OFFSET_FIELD_NAME))
+    assert np.array_equal(indexed, scanned)
+    for row, packet in enumerate((4, 1, 3)):
+        assert np.array_equal(indexed[row], decoder.decode_packets(metadata.iloc[[packet]])[0])
+
+def test_decode_packets_pool(tmp_path):
+    # Packet 2 uses the unimplemented data format C, so fails to decode
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(b''.join(make_packet(i, seed=i, baq_mode=4 if i == 2 else 0) for i in range(6)))
+    decoder = Level0Decoder(str(filename))
+    metadata = decoder.decode_metadata()
+
+    serial = decoder.decode_packets(metadata)
+    assert not serial[2].any()
+    assert serial[3].any()
+    assert np.array_equal(decoder.decode_packets(metadata, num_workers=2), serial)
+
+def test_decode_packets_pool_window(tmp_path, monkeypatch):
+    # Use a window of two chunks of two packets per worker, so the selection
+    # spans several windows, with failed packets either side of a boundary
+    monkeypatch.setattr(l0decoder, '_POOL_CHUNKSIZE', 2)
+    monkeypatch.setattr(l0decoder, '_POOL_CHUNKS_IN_FLIGHT', 1)
+    failed = (3, 4, 9)
+    filename = tmp_path / 'packets.dat'
+    filename.write_bytes(b''.join(make_packet(i, seed=i, baq_mode=4 if i in failed else 0) for i in range(13)))
+    decoder = Level0Decoder(str(filename))
+    selection = decoder.decode_metadata().iloc[::-1]
+
+    serial = decoder.decode_packets(selection)
+    pooled = decoder.decode_packets(selection, num_workers=2)
+    assert np.array_equal(pooled, serial)
+    for row, packet in enumerate(range(12, -1, -1)):
+        assert pooled[row].any() != (packet in failed)
@@ -1,4 +1,7 @@
-from sentinel1decoder._sample_code_bypass import _ten_bit_unsigned_to_signed_int
+import numpy as np
+import pytest
+
+from sentinel1decoder._sample_code_bypass import _ten_bit_unsigned_to_signed_int, decode_bypass_data
 
 def test_ten_bit_unsigned_to_signed_int():
     # 0000000000
@@ -23,4 +26,23 @@ def test_ten_bit_unsigned_to_signed_int():
     assert _ten_bit_unsigned_to_signed_int(0x155) == 341
 
     # 111111111111111111111111111111111111 - too long
-    assert _ten_bit_unsigned_to_signed_int(0xFFFFFFFFFF) == -511
\ No newline at end of file
+    assert _ten_bit_unsigned_to_signed_int(0xFFFFFFFFFF) == -511
+
+def test_decode_bypass_data():
+    # Four 10-bit words packed into five bytes, padded to a 16-bit word boundary
+    words = [0x2bc, 0x001, 0x3ff, 0x155]
+    packed = ((words[0] << 30) | (words[1] << 20) | (words[2] << 10) | words[3]).to_bytes(5, 'big')
+    channel = packed + b'\x00'
+
+    i_evens, i_odds, q_evens, q_odds = decode_bypass_data(4 * channel, 4)
+    for decoded in (i_evens, i_odds, q_evens, q_odds):
+        assert list(decoded) == [-188, 1, -511, 341]
+        assert decoded.dtype == np.float32
+
+    # Fewer quads than a full group of four words
+    i_evens, i_odds, q_evens, q_odds = decode_bypass_data(4 * packed[:4], 3)
+    assert list(q_odds) == [-188, 1, -511]
+
+    # Too little data for the number of quads
+    with pytest.raises(ValueError, match="3 quads"):
+        decode_bypass_data((4 * packed[:4])[:-1], 3)
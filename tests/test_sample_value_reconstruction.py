@@ -0,0 +1,47 @@
+from sentinel1decoder._sample_value_reconstruction import reconstruct_channel_vals
+from sentinel1decoder import _lookup_tables as lookup
+
+import numpy as np
+import pytest
+
+def test_reconstruct_channel_vals():
+    # Two BRC blocks: BRC 0 with a low THIDX (simple reconstruction), then
+    # BRC 4 with a high THIDX (normalized reconstruction levels)
+    block_brcs = [0, 4]
+    block_thidxs = [2, 20]
+    signs = [1, 0] + [0] * 126 + [1] * 2
+    mcodes = [3, 0] + [1] * 126 + [5] * 2
+
+    vals = reconstruct_channel_vals(signs, mcodes, block_brcs, block_thidxs, 130)
+
+    assert len(vals) == 130
+    assert vals.dtype == np.float32
+    # Largest magnitude code is taken from the simple reconstruction table
+    assert vals[0] == -lookup.b0[2]
+    assert vals[1] == 0
+    # Other codes map directly to their magnitude
+    assert vals[2] == 1
+    assert vals[127] == 1
+    assert vals[128] == pytest.approx(-lookup.nrl_b4[5] * lookup.sf[20])
+    assert vals[129] == pytest.approx(-lookup.nrl_b4[5] * lookup.sf[20])
+
+def test_reconstruct_channel_vals_unhandled():
+    # Magnitude code above the BRC 0 maximum, and an undefined BRC
+    assert list(reconstruct_channel_vals([0], [5], [0], [2], 1)) == [0]
+    assert list(reconstruct_channel_vals([0], [1], [6], [40], 1)) == [0]
+
+def test_reconstruct_channel_vals_multichannel():
+    # All channels share the block parameters, and each row matches
+    # reconstructing that channel on its own
+    block_brcs = [1, 3]
+    block_thidxs = [0, 100]
+    rng = np.random.default_rng(0)
+    signs = rng.integers(0, 2, size=(4, 200), dtype=np.uint8)
+    mcodes = rng.integers(0, 4, size=(4, 200), dtype=np.uint8)
+
+    vals = reconstruct_channel_vals(signs, mcodes, block_brcs, block_thidxs, 200)
+
+    assert vals.shape == (4, 200)
+    for channel in range(4):
+        expected = reconstruct_channel_vals(signs[channel], mcodes[channel], block_brcs, block_thidxs, 200)
+        assert np.array_equal(vals[channel], expected)
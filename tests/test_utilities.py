@@ -1,6 +1,8 @@
-from sentinel1decoder.utilities import range_dec_to_sample_rate
+from sentinel1decoder.utilities import range_dec_to_sample_rate, read_subcommed_data
 
 import sentinel1decoder.constants as cnst
+import numpy as np
+import pandas as pd
 import pytest
 
 def test_range_dec_to_sample_rate():
@@ -23,4 +25,26 @@ def test_range_dec_to_sample_rate():
     with pytest.raises(Exception):
         range_dec_to_sample_rate(12)
     with pytest.raises(Exception):
-        range_dec_to_sample_rate(-1)
\ No newline at end of file
+        range_dec_to_sample_rate(-1)
+
+def test_read_subcommed_data():
+    # One full block of 64 words, preceded by an incomplete block
+    words = np.zeros(64, dtype='>u2')
+    words[0:12] = np.array([7e6, -1e6, 2.5], dtype='>f8').view('>u2')
+    words[12:18] = np.array([1.5, -2.0, 7000.0], dtype='>f4').view('>u2')
+    words[18:22] = [1, 2, 256, 0]
+    words[22:30] = np.array([0.5, -0.5, 0.25, 1.0], dtype='>f4').view('>u2')
+    df = pd.DataFrame({
+        cnst.SUBCOM_ANC_DATA_WORD_INDEX_FIELD_NAME: [1, 2, 3] + list(range(1, 65)),
+        cnst.SUBCOM_ANC_DATA_WORD_FIELD_NAME: [9, 9, 9] + words.tolist(),
+    })
+
+    out = read_subcommed_data(df)
+
+    assert len(out) == 1
+    assert out[cnst.X_POS_FIELD_NAME][0] == 7e6
+    assert out[cnst.Y_POS_FIELD_NAME][0] == -1e6
+    assert out[cnst.Z_POS_FIELD_NAME][0] == 2.5
+    assert out[cnst.Z_VEL_FIELD_NAME][0] == 7000.0
+    assert out[cnst.POD_SOLN_DATA_TIMESTAMP_FIELD_NAME][0] == 2**24 + 2 * 2**8 + 1
+    assert out[cnst.Q1_FIELD_NAME][0] == -0.5